@@ -0,0 +1,213 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import httpx
+from prometheus_client import Counter, Gauge
+from solana.rpc.types import TxOpts
+from solders.signature import Signature
+
+from database.redis import CACHE_KEY_PREFIX, redis_config
+from utility.dataconfig import Config, CUSTOM_OPTIONS
+from utility.logger import logger
+
+STATUS_BATCH_SIZE = 256
+RESOLVED_HISTORY = 10000
+TX_STATUS_NAMESPACE = "txstatus"
+TX_STATUS_TTL = 3600
+# TransactionConfirmationStatus converts to these ranks with int().
+TARGET_RANK = {"processed": 0, "confirmed": 1, "finalized": 2}
+
+PENDING = Gauge("solana_pending_transactions", "Transactions awaiting confirmation", multiprocess_mode="livesum")
+RESOLVED = Counter("solana_transactions_resolved_total", "Tracked transactions by outcome", ["status"])
+RESENT = Counter("solana_transactions_resent_total", "Transactions rebroadcast while pending")
+
+redis_config.configure_namespace(TX_STATUS_NAMESPACE, l1_max_entries=10000, l1_ttl=5)
+
+
+def status_cache_key(signature: str) -> str:
+    return f"{CACHE_KEY_PREFIX}:{TX_STATUS_NAMESPACE}:v1:{signature}"
+
+
+@dataclass
+class TrackedTransaction:
+    signature: str
+    raw: bytes
+    last_valid_block_height: Optional[int]
+    status: str = "pending"
+    err: Optional[str] = None
+    checks: int = 0
+    submitted_at: float = field(default_factory=time.time)
+    last_sent_at: float = field(default_factory=time.monotonic)
+    future: asyncio.Future = None
+
+    def to_dict(self) -> dict:
+        return {
+            "signature": self.signature,
+            "status": self.status,
+            "error": self.err,
+            "submitted_at": self.submitted_at,
+        }
+
+
+class ConfirmationTracker:
+    """Confirms every in-flight transaction with batched getSignatureStatuses calls."""
+
+    def __init__(self, manager, options: dict = CUSTOM_OPTIONS, commitment: str = Config.RPC_COMMITMENT,
+                 webhook_url: str = Config.CONFIRMATION_WEBHOOK_URL):
+        self.manager = manager
+        self.check_interval = options["confirmation_check_interval"] / 1000
+        self.resend_interval = options["resend_interval"] / 1000
+        self.max_checks = options["confirmation_retries"]
+        self.expiry_buffer = options["last_valid_block_height_buffer"]
+        self.send_options = options["send_options"]
+        self.target_rank = TARGET_RANK.get(commitment, 1)
+        self.webhook_url = webhook_url
+        self.pending: Dict[str, TrackedTransaction] = {}
+        self.resolved = OrderedDict()
+        self.task = None
+        self.http = None
+
+    def track(self, signature: str, raw: bytes, last_valid_block_height: Optional[int] = None) -> TrackedTransaction:
+        tracked = self.pending.get(signature)
+        if tracked is None:
+            tracked = TrackedTransaction(signature, raw, last_valid_block_height)
+            tracked.future = asyncio.get_running_loop().create_future()
+            self.pending[signature] = tracked
+            PENDING.inc()
+            asyncio.create_task(self.store(tracked))
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+        return tracked
+
+    def get(self, signature: str) -> Optional[TrackedTransaction]:
+        return self.pending.get(signature) or self.resolved.get(signature)
+
+    async def wait(self, signature: str, timeout: Optional[float] = None) -> TrackedTransaction:
+        tracked = self.get(signature)
+        if tracked is None:
+            raise KeyError(signature)
+        return await asyncio.wait_for(asyncio.shield(tracked.future), timeout)
+
+    async def status(self, signature: str, wait: float = 0) -> Optional[dict]:
+        """Status of a transaction tracked by any worker; only the tracking worker holds it in memory."""
+        tracked = self.get(signature)
+        if tracked is not None:
+            if wait and tracked.status == "pending":
+                try:
+                    tracked = await self.wait(signature, wait)
+                except asyncio.TimeoutError:
+                    pass
+            return tracked.to_dict()
+
+        status = await redis_config.get(status_cache_key(signature))
+        deadline = time.monotonic() + wait
+        while status is not None and status["status"] == "pending" and time.monotonic() < deadline:
+            await asyncio.sleep(min(self.check_interval, max(0.0, deadline - time.monotonic())))
+            status = await redis_config.get(status_cache_key(signature)) or status
+        return status
+
+    async def store(self, tx: TrackedTransaction):
+        await redis_config.set(status_cache_key(tx.signature), tx.to_dict(), expire=TX_STATUS_TTL)
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        if self.http:
+            await self.http.aclose()
+            self.http = None
+
+    async def run(self):
+        while True:
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"Error checking transaction confirmations: {str(e)}")
+            await asyncio.sleep(self.check_interval)
+
+    async def check(self):
+        if not self.pending:
+            return
+        tracked = list(self.pending.values())
+        batches = [tracked[start:start + STATUS_BATCH_SIZE] for start in range(0, len(tracked), STATUS_BATCH_SIZE)]
+        responses = await asyncio.gather(*[
+            self.manager.client.get_signature_statuses([Signature.from_string(tx.signature) for tx in batch])
+            for batch in batches
+        ])
+
+        block_height = self.manager.blockhashes.block_height
+        resends = []
+        now = time.monotonic()
+        for batch, response in zip(batches, responses):
+            for tx, status in zip(batch, response.value):
+                tx.checks += 1
+                if status is not None and status.err:
+                    self.resolve(tx, "failed", str(status.err))
+                elif status is not None and status.confirmation_status is not None \
+                        and int(status.confirmation_status) >= self.target_rank:
+                    self.resolve(tx, "confirmed")
+                elif self.expired(tx, block_height):
+                    self.resolve(tx, "expired", "Blockhash expired before confirmation")
+                elif status is None and self.resendable(tx, block_height) \
+                        and now - tx.last_sent_at >= self.resend_interval:
+                    # Only rebroadcast transactions the cluster has not seen yet.
+                    tx.last_sent_at = now
+                    resends.append(tx)
+        if resends:
+            await asyncio.gather(*[self.resend(tx) for tx in resends])
+
+    def resendable(self, tx: TrackedTransaction, block_height: int) -> bool:
+        # Past last_valid_block_height the blockhash can no longer land; rebroadcasting only adds load.
+        if tx.last_valid_block_height is not None and block_height:
+            return block_height <= tx.last_valid_block_height
+        return True
+
+    def expired(self, tx: TrackedTransaction, block_height: int) -> bool:
+        # The buffer is a grace period for statuses still in flight, not a resend window.
+        if tx.last_valid_block_height is not None and block_height:
+            return block_height > tx.last_valid_block_height + self.expiry_buffer
+        return tx.checks >= self.max_checks
+
+    async def resend(self, tx: TrackedTransaction):
+        try:
+            await self.manager.client.send_raw_transaction(
+                tx.raw,
+                opts=TxOpts(
+                    skip_confirmation=True,
+                    skip_preflight=self.send_options["skip_preflight"],
+                    max_retries=self.send_options["max_retries"],
+                )
+            )
+            RESENT.inc()
+        except Exception as e:
+            logger.warning(f"Resending {tx.signature} failed: {str(e)}")
+
+    def resolve(self, tx: TrackedTransaction, status: str, err: Optional[str] = None):
+        tx.status, tx.err = status, err
+        tx.raw = b""
+        self.pending.pop(tx.signature, None)
+        self.resolved[tx.signature] = tx
+        while len(self.resolved) > RESOLVED_HISTORY:
+            self.resolved.popitem(last=False)
+        PENDING.dec()
+        RESOLVED.labels(status).inc()
+        if not tx.future.done():
+            tx.future.set_result(tx)
+        asyncio.create_task(self.store(tx))
+        if self.webhook_url:
+            asyncio.create_task(self.notify(tx))
+
+    async def notify(self, tx: TrackedTransaction):
+        if self.http is None:
+            self.http = httpx.AsyncClient(timeout=10)
+        try:
+            await self.http.post(self.webhook_url, json=tx.to_dict())
+        except Exception as e:
+            logger.warning(f"Confirmation webhook for {tx.signature} failed: {str(e)}")
@@ -1,20 +1,24 @@
 import asyncio
 import aiohttp
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Query, Request, Response
 from typing import List, Optional
 from database.models import Token, TokenPrice, TokenMetrics
 from middleware.web3 import w3_bsc, w3_eth, tokens_collection
 from pymongo import DESCENDING
 from utility.logger import logger
 from core.updatesingletoken import update_single_token
+from core.refreshqueue import refresh_queue
+from core.refreshcluster import refresh_cluster
+from core.pricetick import price_ticks
 from utility.updatealltokens import update_all_tokens
 from database.redis import cached
+from core.tokengeneration import TOKENS_LIST_NAMESPACE, get_tokens_generation
+from utility.conditional import make_etag, not_modified, validator_headers
 
 router = APIRouter()
 
-@router.get("/tokens", response_model=List[Token])
-@cached(expire=1800)
-async def get_tokens(
+@cached(expire=1800, stale_ttl=300, namespace=TOKENS_LIST_NAMESPACE)
+async def list_tokens(
         chain: Optional[str] = None,
         min_liquidity: Optional[float] = None,
         min_volume: Optional[float] = None,
@@ -33,25 +37,87 @@ async def get_tokens(
     return tokens
 
 
+@router.get("/tokens", response_model=List[Token])
+async def get_tokens(
+        request: Request,
+        response: Response,
+        chain: Optional[str] = None,
+        min_liquidity: Optional[float] = None,
+        min_volume: Optional[float] = None,
+        skip: int = 0,
+        limit: int = 50
+):
+    # Any token write bumps the generation, so it versions every list view at once.
+    generation, generated_at = await get_tokens_generation()
+    if generation is not None:
+        etag = make_etag("tokens", generation, chain, min_liquidity, min_volume, skip, limit)
+        unchanged = not_modified(request, etag, generated_at)
+        if unchanged is not None:
+            return unchanged
+        response.headers.update(validator_headers(etag, generated_at))
+    return await list_tokens(chain, min_liquidity, min_volume, skip, limit)
+
+
 @router.get("/token/{chain}/{address}", response_model=Token)
-async def get_token(chain: str, address: str):
+async def get_token(request: Request, response: Response, chain: str, address: str):
     token = tokens_collection.find_one({"address": address.lower(), "chain": chain}, {'_id': 0})
     if token is None:
         raise HTTPException(status_code=404, detail="Token not found")
+
+    modified = [value for value in (token.get("updated_at"), token.get("price_updated_at")) if value is not None]
+    last_modified = max(modified) if modified else None
+    etag = make_etag("token", chain, token["address"], token.get("version", 0), last_modified)
+    unchanged = not_modified(request, etag, last_modified)
+    if unchanged is not None:
+        return unchanged
+    response.headers.update(validator_headers(etag, last_modified))
     return token
 
 
 @router.get("/trending")
-async def get_trending_tokens(timeframe: str = "24h", limit: int = 10):
+async def get_trending_tokens(request: Request, response: Response, timeframe: str = "24h", limit: int = 10):
+    generation, generated_at = await get_tokens_generation()
+    if generation is not None:
+        etag = make_etag("trending", generation, timeframe, limit)
+        unchanged = not_modified(request, etag, generated_at)
+        if unchanged is not None:
+            return unchanged
+        response.headers.update(validator_headers(etag, generated_at))
+
     sort_field = "volume_24h" if timeframe == "24h" else "price.change_6h"
     tokens = list(tokens_collection.find({}, {'_id': 0}).sort(sort_field, DESCENDING).limit(limit))
     return tokens
 
 
+def refresh_job_response(job: dict) -> dict:
+    response = dict(job)
+    if job["status"] == "done":
+        response["token"] = tokens_collection.find_one(
+            {"address": job["address"].lower(), "chain": job["chain"]}, {'_id': 0}
+        )
+    return response
+
+
 @router.post("/tokens/refresh/{chain}/{address}")
-async def refresh_token(chain: str, address: str, background_tasks: BackgroundTasks):
-    background_tasks.add_task(update_single_token, chain, address)
-    return {"message": "Token refresh scheduled"}
+async def refresh_token(chain: str, address: str, wait: float = Query(0, ge=0, le=30)):
+    job_id = None
+    if refresh_cluster.running:
+        try:
+            job_id = await refresh_cluster.enqueue(chain, address)
+        except Exception as e:
+            logger.error(f"Error queueing refresh on the cluster, refreshing locally: {str(e)}")
+    if job_id is None:
+        job_id = (await refresh_queue.submit(chain, address)).id
+    status = await refresh_queue.status(job_id, wait)
+    return {"message": "Token refresh scheduled", **refresh_job_response(status)}
+
+
+@router.get("/tokens/refresh/jobs/{job_id}")
+async def get_refresh_job(job_id: str, wait: float = Query(0, ge=0, le=30)):
+    job = await refresh_queue.status(job_id, wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Refresh job not found")
+    return refresh_job_response(job)
 
 @router.on_event("startup")
 async def start_background_tasks():
@@ -63,4 +129,15 @@ async def start_background_tasks():
                 logger.error(f"Error in periodic update: {str(e)}")
             await asyncio.sleep(300)
 
-    asyncio.create_task(periodic_update())
+    try:
+        await refresh_cluster.start(leader_tasks=[price_ticks.run])
+    except Exception as e:
+        logger.error(f"Cluster refresh unavailable, falling back to local updates: {str(e)}")
+        asyncio.create_task(periodic_update())
+        asyncio.create_task(price_ticks.run())
+
+
+@router.on_event("shutdown")
+async def stop_background_tasks():
+    await refresh_cluster.stop()
+    await refresh_queue.stop()
@@ -1,35 +1,143 @@
+import asyncio
 import json
-from typing import Dict, Any
-from solana.rpc.api import Client
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+from prometheus_client import Counter, Gauge
+from solana.rpc.async_api import AsyncClient
 from solana.transaction import Transaction 
 from solders.pubkey import Pubkey
 from solders.keypair import Keypair
 from solana.rpc.types import TxOpts
 from spl.token.constants import TOKEN_PROGRAM_ID
-from spl.token.client import Token
 from solders.system_program import transfer, TransferParams
 import time
 from spl.token.instructions import (
     get_associated_token_address,
     transfer_checked,
     TransferCheckedParams,
-    create_associated_token_account,
 )
 from utility.dataconfig import Config
 from solana.rpc.types import TokenAccountOpts, TxOpts
 from solders.compute_budget import set_compute_unit_limit, set_compute_unit_price
+from solders.instruction import AccountMeta, Instruction
+from solders.system_program import ID as SYS_PROGRAM_ID
+from spl.token.constants import ASSOCIATED_TOKEN_PROGRAM_ID
 from utility.logger import logging
+from api.confirmations import ConfirmationTracker, TrackedTransaction
 
 logger = logging.getLogger("solana_transactions")
 
+BLOCKHASH_POLL_INTERVAL = 0.4
+# Roughly 12s of blocks: a transaction built on an older blockhash risks expiring before it lands.
+BLOCKHASH_EXPIRY_BUFFER = 30
+BLOCKHASH_MAX_AGE = 10
+SLOT_TIME = 0.4
+BLOCKHASH_HISTORY = 512
+# A blockhash is valid for 150 blocks (~60s); past this a send is expired, not slow.
+CONFIRMATION_TIMEOUT = 90
+
+BLOCKHASH_AGE = Gauge("solana_blockhash_age_seconds", "Age of the cached recent blockhash", multiprocess_mode="liveall")
+BLOCKHASH_FALLBACKS = Counter("solana_blockhash_fallbacks_total", "Transactions that fetched a blockhash inline")
+
+
+class BlockhashCache:
+   """Polls the latest blockhash in the background so transaction builders never wait on RPC."""
+
+   def __init__(self, client: AsyncClient, interval: float = BLOCKHASH_POLL_INTERVAL,
+                expiry_buffer: int = BLOCKHASH_EXPIRY_BUFFER, max_age: float = BLOCKHASH_MAX_AGE):
+       self.client = client
+       self.interval = interval
+       self.expiry_buffer = expiry_buffer
+       self.max_age = max_age
+       self.blockhash = None
+       self.last_valid_block_height = 0
+       self.block_height = 0
+       self.fetched_at = 0.0
+       self.seen = OrderedDict()
+       self.task = None
+
+   def start(self):
+       if self.task is None:
+           self.task = asyncio.create_task(self.run())
+
+   async def stop(self):
+       if self.task:
+           self.task.cancel()
+           try:
+               await self.task
+           except asyncio.CancelledError:
+               pass
+           self.task = None
+
+   def update(self, blockhash, last_valid_block_height: int, block_height: int):
+       now = time.monotonic()
+       self.blockhash = blockhash
+       self.last_valid_block_height = last_valid_block_height
+       self.block_height = block_height
+       self.fetched_at = now
+       self.seen.setdefault(str(blockhash), (now, last_valid_block_height))
+       while len(self.seen) > BLOCKHASH_HISTORY:
+           self.seen.popitem(last=False)
+
+   async def refresh(self):
+       latest, height = await asyncio.gather(self.client.get_latest_blockhash(), self.client.get_block_height())
+       self.update(latest.value.blockhash, latest.value.last_valid_block_height, height.value)
+
+   async def run(self):
+       while True:
+           try:
+               await self.refresh()
+           except Exception as e:
+               logger.warning(f"Blockhash refresh failed: {str(e)}")
+           BLOCKHASH_AGE.set(self.age)
+           await asyncio.sleep(self.interval)
+
+   @property
+   def age(self) -> float:
+       return time.monotonic() - self.fetched_at if self.blockhash else float("inf")
+
+   def age_of(self, blockhash) -> Optional[float]:
+       seen = self.seen.get(str(blockhash))
+       return time.monotonic() - seen[0] if seen is not None else None
+
+   def last_valid_of(self, blockhash) -> Optional[int]:
+       seen = self.seen.get(str(blockhash))
+       return seen[1] if seen is not None else None
+
+   def get(self) -> Optional[Tuple[Any, int]]:
+       """Cached (blockhash, last_valid_block_height), or None when missing, stale or close to expiry."""
+       age = self.age
+       if age > self.max_age:
+           return None
+       estimated_height = self.block_height + age / SLOT_TIME
+       if estimated_height >= self.last_valid_block_height - self.expiry_buffer:
+           return None
+       return self.blockhash, self.last_valid_block_height
+
+
 class SolanaTransactionManager:
-   def __init__(self, rpc_url: str):
-       self.client = Client(rpc_url, commitment="confirmed", timeout=30)
+   def __init__(self, rpc_url: str, timeout: float = Config.RPC_TIMEOUT, commitment: str = Config.RPC_COMMITMENT):
+       self.client = AsyncClient(rpc_url, commitment=commitment, timeout=timeout)
        self.config = Config()
+       self.blockhashes = BlockhashCache(self.client)
+       self.confirmations = ConfirmationTracker(self)
+
+   def start(self):
+       self.blockhashes.start()
 
-   def get_transaction_builder(self, fee_payer: Pubkey) -> Transaction:
+   async def close(self):
+       await self.confirmations.stop()
+       await self.blockhashes.stop()
+       await self.client.close()
+
+   async def get_transaction_builder(self, fee_payer: Pubkey) -> Transaction:
        try:
-           blockhash = self.client.get_latest_blockhash().value.blockhash
+           cached = self.blockhashes.get()
+           if cached is None:
+               BLOCKHASH_FALLBACKS.inc()
+               await self.blockhashes.refresh()
+               cached = self.blockhashes.get() or (self.blockhashes.blockhash, self.blockhashes.last_valid_block_height)
+           blockhash, _ = cached
            return Transaction(fee_payer=fee_payer, recent_blockhash=blockhash)
        except Exception as e:
            logger.error(f"Error getting transaction builder: {str(e)}")
@@ -45,37 +153,53 @@ class SolanaTransactionManager:
            logger.error(f"Error adding compute budget: {str(e)}")
            raise
 
-   def  send_transaction(self, transaction: Transaction) -> str:
+   async def send_transaction(self, transaction: Transaction) -> str:
        try:
            serialized_txn = transaction.serialize()
-           resp = self.client.send_raw_transaction(
+           resp = await self.client.send_raw_transaction(
                serialized_txn,
                opts=TxOpts(skip_confirmation=True, preflight_commitment="confirmed")
            )
            result = json.loads(resp.to_json())['result']
            logger.info(f"Transaction sent successfully: {result}")
+           self.confirmations.track(
+               result, serialized_txn, self.blockhashes.last_valid_of(transaction.recent_blockhash)
+           )
            return result
        except Exception as e:
-           logger.error(f"Failed to send transaction: {str(e)}")
+           age = self.blockhashes.age_of(transaction.recent_blockhash)
+           age_note = f" (blockhash age {age:.1f}s)" if age is not None else ""
+           logger.error(f"Failed to send transaction{age_note}: {str(e)}")
            raise
 
-   def send_swap(self, transaction: Transaction) -> str:
+   async def confirm_transaction(self, signature: str, timeout: Optional[float] = None) -> TrackedTransaction:
+       """Wait for a transaction sent through this manager to be confirmed; raise if it fails or expires."""
+       try:
+           tracked = await self.confirmations.wait(signature, timeout)
+       except asyncio.TimeoutError:
+           raise Exception(f"Transaction {signature} not confirmed within {timeout}s")
+       if tracked.status != "confirmed":
+           raise Exception(f"Transaction {signature} {tracked.status}: {tracked.err}")
+       return tracked
+
+   async def send_swap(self, transaction: Transaction, last_valid_block_height: Optional[int] = None) -> str:
        try:
            serialized_txn = bytes(transaction)
-           resp = self.client.send_raw_transaction(
+           resp = await self.client.send_raw_transaction(
                serialized_txn,
                opts=TxOpts(skip_confirmation=True, preflight_commitment="processed")
            )
            logger.info(f"Swap transaction sent successfully")
+           self.confirmations.track(str(resp.value), serialized_txn, last_valid_block_height)
            return resp
        except Exception as e:
            logger.error(f"Failed to send swap transaction: {str(e)}")
            raise
 
-   def get_spl_token_decimals(self, token_address: str) -> int:
+   async def get_spl_token_decimals(self, token_address: str) -> int:
        try:
            token_pubkey = Pubkey.from_string(token_address)
-           supply_response = self.client.get_token_supply(token_pubkey)
+           supply_response = await self.client.get_token_supply(token_pubkey)
            if supply_response.value:
                logger.info(f"Retrieved decimals for token {token_address}")
                return supply_response.value.decimals
@@ -85,9 +209,29 @@ class SolanaTransactionManager:
            logger.error(f"Error fetching token decimals: {str(e)}")
            return None
 
-def send_sol(src_key: str, dest_addr: str, amt_sol: float) -> str:
+
+solana_manager: Optional[SolanaTransactionManager] = None
+
+
+def get_solana_manager() -> SolanaTransactionManager:
+    """Shared manager; its AsyncClient pools connections across every wallet route."""
+    global solana_manager
+    if solana_manager is None:
+        solana_manager = SolanaTransactionManager(Config.RPC_URL)
+        solana_manager.start()
+    return solana_manager
+
+
+async def close_solana_manager():
+    global solana_manager
+    if solana_manager is not None:
+        await solana_manager.close()
+        solana_manager = None
+
+
+async def send_sol(src_key: str, dest_addr: str, amt_sol: float) -> str:
     try:
-        manager = SolanaTransactionManager(Config.RPC_URL)
+        manager = get_solana_manager()
         try:
             src_keypair = Keypair.from_base58_string(src_key)
         except Exception as e:
@@ -102,7 +246,7 @@ def send_sol(src_key: str, dest_addr: str, amt_sol: float) -> str:
 
         send_amt_lamps = int(amt_sol * Config.LAMPORTS_PER_SOL)
 
-        txn = manager.get_transaction_builder(src_keypair.pubkey())
+        txn = await manager.get_transaction_builder(src_keypair.pubkey())
         txn.add(
         transfer(
             TransferParams(
@@ -114,40 +258,51 @@ def send_sol(src_key: str, dest_addr: str, amt_sol: float) -> str:
         )   
         txn.sign(src_keypair)
 
-        return manager.send_transaction(txn)
+        return await manager.send_transaction(txn)
     except Exception as e:
         logger.error(f"Failed to send SOL: {str(e)}")
         raise
 
     
-def create_assoc_tkn_acct(payer: Keypair, owner: Pubkey, mint: Pubkey) -> Pubkey:
-    manager = SolanaTransactionManager(Config.RPC_URL)
-    txn = manager.get_transaction_builder(payer.pubkey())
-    create_txn = create_associated_token_account(payer=payer.pubkey(), owner=owner, mint=mint)
-    txn.add(create_txn)
+def create_idempotent_associated_token_account(payer: Pubkey, owner: Pubkey, mint: Pubkey) -> Instruction:
+    """CreateIdempotent (instruction 1) succeeds as a no-op when the ATA already exists,
+    so it can share a transaction with the transfer that needs it."""
+    return Instruction(
+        accounts=[
+            AccountMeta(pubkey=payer, is_signer=True, is_writable=True),
+            AccountMeta(pubkey=get_associated_token_address(owner, mint), is_signer=False, is_writable=True),
+            AccountMeta(pubkey=owner, is_signer=False, is_writable=False),
+            AccountMeta(pubkey=mint, is_signer=False, is_writable=False),
+            AccountMeta(pubkey=SYS_PROGRAM_ID, is_signer=False, is_writable=False),
+            AccountMeta(pubkey=TOKEN_PROGRAM_ID, is_signer=False, is_writable=False),
+        ],
+        program_id=ASSOCIATED_TOKEN_PROGRAM_ID,
+        data=bytes([1]),
+    )
+
+
+async def create_assoc_tkn_acct(payer: Keypair, owner: Pubkey, mint: Pubkey) -> Pubkey:
+    manager = get_solana_manager()
+    txn = await manager.get_transaction_builder(payer.pubkey())
+    txn.add(create_idempotent_associated_token_account(payer=payer.pubkey(), owner=owner, mint=mint))
     manager.add_compute_budget(txn)
     txn.sign(payer)
-    manager.send_transaction(txn)
-    print(get_associated_token_address(owner,mint))
+    signature = await manager.send_transaction(txn)
+    await manager.confirm_transaction(signature, timeout=CONFIRMATION_TIMEOUT)
     return get_associated_token_address(owner, mint)
 
 
-def get_tkn_acct(wallet_addr: Pubkey, tkn_addr: Pubkey) -> Dict[str, Any]:
-   client = Client(Config.RPC_URL)
+async def get_tkn_acct(wallet_addr: Pubkey, tkn_addr: Pubkey) -> Dict[str, Any]:
+   client = get_solana_manager().client
    try:
-       tkn_acct_data = client.get_token_accounts_by_owner(wallet_addr, TokenAccountOpts(tkn_addr))
+       tkn_acct_data = await client.get_token_accounts_by_owner(wallet_addr, TokenAccountOpts(tkn_addr))
 
        if not tkn_acct_data.value:
            logger.warning(f"No token account found for wallet: {wallet_addr}")
            return {'tkn_acct_pubkey': None, 'tkn_bal': 0, 'tkn_dec': 0}
 
        tkn_acct_pubkey = tkn_acct_data.value[0].pubkey
-       balance_info = Token(
-           conn=client,
-           pubkey=tkn_addr,
-           program_id=TOKEN_PROGRAM_ID,
-           payer=client
-       ).get_balance(tkn_acct_pubkey)
+       balance_info = await client.get_token_account_balance(tkn_acct_pubkey)
 
        result = {
            'tkn_acct_pubkey': tkn_acct_pubkey,
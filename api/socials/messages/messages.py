@@ -4,8 +4,7 @@ from datetime import datetime
 from typing import List
 from pydantic import BaseModel
 from database.database import Database, get_database
-from requests import Request
-from bson import ObjectId
+from middleware.session import SessionPrincipal, get_session_principal
 
 router = APIRouter(
     prefix="/api/messages",
@@ -27,43 +26,17 @@ class Message(MessageCreate):
 @router.post("/send")
 async def send_message(
     message: MessageCreate,
-    request: Request,
+    principal: SessionPrincipal = Depends(get_session_principal),
     db: Database = Depends(get_database)
 ):
     try:
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, 
-                detail="Invalid authorization header"
-            )
-
-        session_token = auth_header.split(' ')[1]
-        session = await db.sessions.find_one({
-            "session_token": session_token,
-            "expires_at": {"$gt": datetime.utcnow()}
-        })
-
-        if not session:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired session"
-            )
-
-        user = await db.users.find_one({"_id": ObjectId(session["user_id"])})
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-
         message_data = {
             "channel": message.channel,
             "content": message.content,
-            "user_id": str(user["_id"]),
-            "username": user.get("twitter_username", user["username"]),
-            "profile_image": user.get("twitter_profile_image"),
-            "full_name": user.get("full_name"),
+            "user_id": principal.user_id,
+            "username": principal.username,
+            "profile_image": principal.profile_image,
+            "full_name": principal.full_name,
             "timestamp": datetime.utcnow()
         }
 
@@ -86,31 +59,12 @@ async def send_message(
 @router.get("/channel/{channel_id}")
 async def get_channel_messages(
     channel_id: str,
-    request: Request,
     limit: int = 50,
     before: datetime = None,
+    principal: SessionPrincipal = Depends(get_session_principal),
     db: Database = Depends(get_database)
 ):
     try:
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authorization header"
-            )
-
-        session_token = auth_header.split(' ')[1]
-        session = await db.sessions.find_one({
-            "session_token": session_token,
-            "expires_at": {"$gt": datetime.utcnow()}
-        })
-
-        if not session:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired session"
-            )
-
         query = {"channel": channel_id}
         if before:
             query["timestamp"] = {"$lt": before}
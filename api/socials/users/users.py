@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from datetime import datetime
 from database.database import Database, get_database
 from bson import ObjectId
-from requests import Request
+from middleware.session import SessionPrincipal, get_session_principal
+from utility.conditional import make_etag, not_modified, validator_headers
 
 router = APIRouter(
     prefix="/api/users",
@@ -11,19 +12,10 @@ router = APIRouter(
 
 @router.get("/online")
 async def get_online_users(
-    request: Request,
+    principal: SessionPrincipal = Depends(get_session_principal),
     db: Database = Depends(get_database)
 ):
     try:
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authorization header"
-            )
-
-        session_token = auth_header.split(' ')[1]
-        
         active_sessions = await db.sessions.find({
             "expires_at": {"$gt": datetime.utcnow()}
         }).to_list(length=100)
@@ -54,35 +46,25 @@ async def get_online_users(
 @router.get("/profile")
 async def get_user_profile(
     request: Request,
+    response: Response,
+    principal: SessionPrincipal = Depends(get_session_principal),
     db: Database = Depends(get_database)
 ):
     try:
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authorization header"
-            )
-
-        session_token = auth_header.split(' ')[1]
-        session = await db.sessions.find_one({
-            "session_token": session_token,
-            "expires_at": {"$gt": datetime.utcnow()}
-        })
-
-        if not session:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired session"
-            )
-
-        user = await db.users.find_one({"_id": ObjectId(session["user_id"])})
+        user = await db.users.find_one({"_id": ObjectId(principal.user_id)})
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
 
+        last_modified = user.get("updated_at") or user.get("created_at")
+        etag = make_etag("profile", str(user["_id"]), user.get("updated_at"), user.get("last_login"))
+        unchanged = not_modified(request, etag, last_modified)
+        if unchanged is not None:
+            return unchanged
+        response.headers.update(validator_headers(etag, last_modified))
+
         return {
             "status": "success",
             "profile": {
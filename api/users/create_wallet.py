@@ -1,17 +1,23 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from solana.rpc.api import Client
 from solders.keypair import Keypair # type: ignore
 import httpx
 from base58 import b58encode # type: ignore
-from typing import Dict
-from database.models import WalletResponse, PhraseRequest
+from typing import Dict, List
+from database.models import WalletResponse, PhraseRequest, PhrasesRequest
 import uuid
 from mnemonic import Mnemonic # type: ignore
+from base58 import b58decode # type: ignore
 
 from bip32utils import BIP32Key # type: ignore
 import hashlib
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from core.walletpool import wallet_pool
+from utility import cputasks
+from utility.cpuexecutor import cpu_executor
+from utility.logger import logger
 
 router = APIRouter(
     prefix="/api/auth",
@@ -19,21 +25,81 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+MAX_BATCH_WALLETS = 100
+MAX_BATCH_VERIFY = 100
+
+mnemo = Mnemonic("english")
+
 class PrivateKeyRequest(BaseModel):
     private_key: str
 
+class PrivateKeysRequest(BaseModel):
+    private_keys: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_VERIFY)
+
+class CreateWalletsRequest(BaseModel):
+    count: int = Field(..., ge=1, le=MAX_BATCH_WALLETS)
+
+
+def worker_chunks(items: list) -> List[list]:
+    # One chunk per worker keeps per-task overhead low while still using every core.
+    size = -(-len(items) // cpu_executor.max_workers)
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def verify_error(message: str) -> dict:
+    return {
+        "status": "error",
+        "valid": False,
+        "message": message
+    }
+
+
+async def generate_wallets(count: int) -> List[dict]:
+    wallets = await wallet_pool.take(count)
+    missing = count - len(wallets)
+    if missing:
+        chunks = worker_chunks(list(range(missing)))
+        for generated in await asyncio.gather(*[cpu_executor.run(cputasks.generate_wallets, len(chunk)) for chunk in chunks]):
+            wallets.extend(generated)
+    return wallets
+
+
+async def verify_phrases(phrases: List[str]) -> List[dict]:
+    results = [verify_error("Invalid solana phrase") for _ in phrases]
+    # The checksum is cheap, so only phrases that pass it are sent for PBKDF2 derivation.
+    valid = [i for i, phrase in enumerate(phrases) if mnemo.check(phrase)]
+    if not valid:
+        return results
+
+    chunks = worker_chunks(valid)
+    derived = await asyncio.gather(*[
+        cpu_executor.run(cputasks.derive_wallets, [phrases[i] for i in chunk]) for chunk in chunks
+    ])
+    for chunk, wallets in zip(chunks, derived):
+        for i, wallet in zip(chunk, wallets):
+            if wallet is None:
+                results[i] = verify_error("Invalid Solana wallet phrase")
+            else:
+                results[i] = {"status": "success", "valid": True, "wallet_id": str(uuid.uuid4()), **wallet}
+    return results
+
+
+def verify_private_key_value(private_key: str) -> dict:
+    try:
+        keypair = Keypair.from_bytes(b58decode(private_key))
+    except Exception:
+        return verify_error("Invalid Solana private key")
+    return {"status": "success", "valid": True, "public_key": str(keypair.pubkey())}
+
 @router.post("/createwallet", response_model=WalletResponse)
 async def create_wallet():
     try:
         wallet_id = str(uuid.uuid4())
-        mnemo = Mnemonic("english")
-        mnemonic_phrase = mnemo.generate(strength=128)
-        seed = mnemo.to_seed(mnemonic_phrase)
-        keypair = Keypair.from_seed(hashlib.sha256(seed).digest()[:32])
-        public_key = str(keypair.pubkey())
-        private_key = b58encode(bytes(keypair)).decode('ascii')
-    
+        wallet = (await generate_wallets(1))[0]
+        return WalletResponse(status="success", wallet_id=wallet_id, **wallet)
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error creating wallet: {str(e)}")
         raise HTTPException(
@@ -41,55 +107,55 @@ async def create_wallet():
             detail=str(e)
         )
 
+@router.post("/createwallets", response_model=List[WalletResponse])
+async def create_wallets(request: CreateWalletsRequest):
+    try:
+        wallets = await generate_wallets(request.count)
+        return [
+            WalletResponse(status="success", wallet_id=str(uuid.uuid4()), **wallet)
+            for wallet in wallets
+        ]
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating wallets: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
 @router.post("/verifyphrase")
 async def verify_phrase(request: PhraseRequest):
     try:
-        mnemo = Mnemonic("english")
-        if not mnemo.check(request.phrase):
-            return {
-                "status": "error",
-                "valid": False,
-                "message": "Invalid solana phrase"
-            }
-        try:
-            wallet_id = str(uuid.uuid4())
-            seed = mnemo.to_seed(request.phrase)
-            keypair = Keypair.from_seed(hashlib.sha256(seed).digest()[:32])
-            public_key = str(keypair.pubkey())
-            private_key = b58encode(bytes(keypair)).decode('ascii')
-
-
-        except Exception as e:
-            return {
-                "status": "error",
-                "valid": False,
-                "message": "Invalid Solana wallet phrase"
-            }
+        return (await verify_phrases([request.phrase]))[0]
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
 
-@router.post("/verifyprivatekey")
-async def verify_private_key(request: PrivateKeyRequest):
+@router.post("/verifyphrases")
+async def verify_phrases_batch(request: PhrasesRequest):
     try:
-        try:
-            from base58 import b58decode
-            private_key_bytes = b58decode(request.private_key)
-            keypair = Keypair.from_bytes(private_key_bytes)
-            
-
-        except Exception as e:
-            return {
-                "status": "error",
-                "valid": False,
-                "message": "Invalid Solana private key"
-            }
+        return {"status": "success", "results": await verify_phrases(request.phrases)}
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
-        )
\ No newline at end of file
+        )
+
+@router.post("/verifyprivatekey")
+async def verify_private_key(request: PrivateKeyRequest):
+    return verify_private_key_value(request.private_key)
+
+@router.post("/verifyprivatekeys")
+async def verify_private_keys(request: PrivateKeysRequest):
+    # Keypair.from_bytes is microseconds per key, so this stays in-process.
+    return {"status": "success", "results": [verify_private_key_value(key) for key in request.private_keys]}
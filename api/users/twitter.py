@@ -11,6 +11,7 @@ from datetime import timedelta
 
 from database.database import Database, get_database
 from database.models import TwitterTokenData
+from middleware.session import bearer_token, evict_session, resolve_session, session_touches
 
 router = APIRouter(
     prefix="/api/auth",
@@ -76,23 +77,14 @@ async def verify_session(
     db: Database = Depends(get_database)
 ):
     try:
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
+        session_token = bearer_token(request)
+        if not session_token:
             raise HTTPException(status_code=401, detail="Invalid authorization header")
 
-        session_token = auth_header.split(' ')[1]
-        session = await db.sessions.find_one({
-            "session_token": session_token,
-            "expires_at": {"$gt": datetime.utcnow()}
-        })
-
-        if not session:
+        if await resolve_session(session_token, db) is None:
             return {"isValid": False}
 
-        await db.sessions.update_one(
-            {"session_token": session_token},
-            {"$set": {"last_accessed": datetime.utcnow()}}
-        )
+        session_touches.touch(session_token)
 
         return {"isValid": True}
     except Exception as e:
@@ -105,20 +97,18 @@ async def twitter_logout(
     db: Database = Depends(get_database)
 ):
     try:
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
+        session_token = bearer_token(request)
+        if not session_token:
             raise HTTPException(status_code=401, detail="Invalid authorization header")
 
-        session_token = auth_header.split(' ')[1]
-        session = await db.sessions.find_one({
+        result = await db.sessions.delete_one({
             "session_token": session_token,
             "expires_at": {"$gt": datetime.utcnow()}
         })
-
-        if not session:
+        await evict_session(session_token)
+        if not result.deleted_count:
             raise HTTPException(status_code=401, detail="Invalid session token")
 
-        await db.sessions.delete_one({"session_token": session_token})
         return {"status": "success"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,6 +1,5 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Request
+from fastapi import APIRouter, HTTPException, Depends, status, Request, Response
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm, OAuth2AuthorizationCodeBearer
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from google.oauth2 import id_token
@@ -9,6 +8,10 @@ import aiohttp
 from typing import Optional
 from database.database import get_database, Database, db
 from database.models import User, UserInDB, TokenData
+from middleware.auth import bump_user_version, load_principal
+from utility import cputasks
+from utility.cpuexecutor import cpu_executor
+from utility.conditional import make_etag, not_modified, validator_headers
 
 router = APIRouter(
     prefix="/api/auth",
@@ -16,7 +19,6 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 google_oauth2_scheme = OAuth2AuthorizationCodeBearer(
     authorizationUrl="https://accounts.google.com/o/oauth2/v2/auth",
@@ -27,14 +29,11 @@ SECRET_KEY = ""
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    try:
-        return pwd_context.verify(plain_password, hashed_password)
-    except Exception:
-        return False
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await cpu_executor.run(cputasks.verify_password, plain_password, hashed_password)
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+async def get_password_hash(password: str) -> str:
+    return await cpu_executor.run(cputasks.hash_password, password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -53,10 +52,10 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         username = payload.get("sub")
         if not username:
             raise credentials_exception
-        user = await db.users.find_one({"username": username})
+        user = await load_principal(token, payload, {"username": username})
         if not user:
             raise credentials_exception
-        return UserInDB(**user)
+        return user
     except JWTError:
         raise credentials_exception
 
@@ -101,7 +100,7 @@ async def register_user(user_data: UserInDB, request: Request, db: Database = De
         )
 
     user_dict = user_data.model_dump(exclude={"id"})
-    user_dict["password"] = pwd_context.hash(user_dict["password"])
+    user_dict["password"] = await get_password_hash(user_dict["password"])
     user_dict["created_at"] = datetime.utcnow()
     user_dict["updated_at"] = datetime.utcnow()
     user_dict["auth_provider"] = "local"
@@ -134,7 +133,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
                 detail="Incorrect username or password"
             )
 
-        if not verify_password(form_data.password, user["password"]):
+        if not await verify_password(form_data.password, user["password"]):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password"
@@ -150,6 +149,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
             {"_id": user["_id"]},
             {"$set": {"last_login": datetime.utcnow()}}
         )
+        await bump_user_version(str(user["_id"]))
 
         return {
             "access_token": access_token,
@@ -157,6 +157,8 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
             "user_id": str(user["_id"])
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -220,6 +222,7 @@ async def google_callback(code: str, request: Request, db: Database = Depends(ge
                     return_document=True
                 )
 
+                await bump_user_version(str(result["_id"]))
                 tokens = await create_tokens(str(result["_id"]), request)
                 return tokens
 
@@ -230,8 +233,14 @@ async def google_callback(code: str, request: Request, db: Database = Depends(ge
                 )
 
 @router.get("/me", response_model=User)
-async def get_user_profile(current_user: UserInDB = Depends(get_current_user)):
-    return User(**current_user.dict())
+async def get_user_profile(request: Request, response: Response, current_user: User = Depends(get_current_user)):
+    last_modified = current_user.updated_at or current_user.created_at
+    etag = make_etag("me", current_user.model_dump(mode="json"))
+    unchanged = not_modified(request, etag, last_modified)
+    if unchanged is not None:
+        return unchanged
+    response.headers.update(validator_headers(etag, last_modified))
+    return current_user
 
 @router.post("/refresh-token")
 async def refresh_token(current_refresh_token: str, request: Request, db: Database = Depends(get_database)):
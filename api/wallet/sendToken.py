@@ -15,10 +15,10 @@ from datetime import datetime
 import pytz
 from solana.rpc.types import TokenAccountOpts
 import httpx
-import time
+import asyncio
 
 from utility.dataconfig import Config
-from ..main import create_assoc_tkn_acct, SolanaTransactionManager, get_tkn_acct
+from ..main import create_idempotent_associated_token_account, get_solana_manager, get_tkn_acct
 
 router = APIRouter(
     prefix="/api/wallet",
@@ -81,22 +81,24 @@ async def send_tkn(request: SendTokenRequest):
         src_keypair = Keypair.from_base58_string(request.src_key)
         tkn_pubkey = Pubkey.from_string(request.tkn_addr)
         dest_pubkey = Pubkey.from_string(request.dest_addr)
-        manager = SolanaTransactionManager(Config.RPC_URL)
+        manager = get_solana_manager()
         
-        src_tkn_data = get_tkn_acct(src_keypair.pubkey(), tkn_pubkey)
+        src_tkn_data, dest_tkn_data = await asyncio.gather(
+            get_tkn_acct(src_keypair.pubkey(), tkn_pubkey),
+            get_tkn_acct(dest_pubkey, tkn_pubkey)
+        )
         if not src_tkn_data['tkn_acct_pubkey']:
             raise HTTPException(status_code=400, detail="Source account does not have that token")
 
-        dest_tkn_data = get_tkn_acct(dest_pubkey, tkn_pubkey)
-        
-        dest_tkn_acct_pubkey = (
-            dest_tkn_data['tkn_acct_pubkey'] if dest_tkn_data['tkn_acct_pubkey']
-            else create_assoc_tkn_acct(src_keypair, dest_pubkey, tkn_pubkey)
-        )
-        
-        time.sleep(15)
-        
-        txn = manager.get_transaction_builder(src_keypair.pubkey())
+        txn = await manager.get_transaction_builder(src_keypair.pubkey())
+        if dest_tkn_data['tkn_acct_pubkey']:
+            dest_tkn_acct_pubkey = dest_tkn_data['tkn_acct_pubkey']
+        else:
+            # Create the destination ATA in the same transaction instead of waiting for a separate one to land.
+            dest_tkn_acct_pubkey = get_associated_token_address(dest_pubkey, tkn_pubkey)
+            txn.add(create_idempotent_associated_token_account(src_keypair.pubkey(), dest_pubkey, tkn_pubkey))
+            manager.add_compute_budget(txn)
+
         send_amt_lamps = int(request.tkn_amt * 10 ** int(src_tkn_data['tkn_dec']))
         txn.add(transfer_checked(
             TransferCheckedParams(
@@ -110,7 +112,7 @@ async def send_tkn(request: SendTokenRequest):
             )
         ))
         txn.sign(src_keypair)
-        txn_hash = manager.send_transaction(txn)
+        txn_hash = await manager.send_transaction(txn)
         transaction_details = {
             "transaction_hash": txn_hash,
             "amount": request.tkn_amt,
@@ -6,7 +6,7 @@ from spl.token.constants import TOKEN_PROGRAM_ID
 from spl.token.instructions import transfer_checked, TransferCheckedParams
 from utility.dataconfig import Config
 from utility.create_acc import JupiterReferralAPI
-from ..main import create_assoc_tkn_acct, SolanaTransactionManager, get_tkn_acct
+from ..main import create_assoc_tkn_acct, get_solana_manager, get_tkn_acct
 import aiohttp
 import base64
 import json
@@ -115,10 +115,10 @@ def handle_transaction_error(e: Exception) -> HTTPException:
 
 async def handle_token_account_setup(keypair, to_token_pubkey):
     try:
-        to_token_account = get_tkn_acct(keypair.pubkey(), to_token_pubkey)
+        to_token_account = await get_tkn_acct(keypair.pubkey(), to_token_pubkey)
         if not to_token_account['tkn_acct_pubkey']:
             logger.info("Creating new associated token account")
-            create_assoc_tkn_acct(keypair, keypair.pubkey(), to_token_pubkey)
+            await create_assoc_tkn_acct(keypair, keypair.pubkey(), to_token_pubkey)
     except Exception as e:
         logger.error(f"Token account setup failed: {str(e)}")
         error_data = e.args[0] if e.args else None
@@ -206,7 +206,7 @@ async def perform_swap(request: SwapRequest):
     data = request.dict()
     
     try:
-        manager = SolanaTransactionManager(Config.RPC_URL)
+        manager = get_solana_manager()
         logger.info("Starting swap operation")
 
         # Validate request data
@@ -261,7 +261,7 @@ async def perform_swap(request: SwapRequest):
 
         # Quote fetching with detailed error handling
         try:
-            decimals = manager.get_spl_token_decimals(data['from_token'])
+            decimals = await manager.get_spl_token_decimals(data['from_token'])
             if decimals is None:
                 raise ValueError("Failed to fetch token decimals")
 
@@ -316,7 +316,7 @@ async def perform_swap(request: SwapRequest):
             signature = keypair.sign_message(message.to_bytes_versioned(raw_transaction.message))
             signed_txn = VersionedTransaction.populate(raw_transaction.message, [signature])
             
-            result = manager.send_swap(signed_txn)
+            result = await manager.send_swap(signed_txn, swap_data.get('lastValidBlockHeight'))
             transaction_id = json.loads(result.to_json())['result']
             
             transaction_data = {
@@ -1,12 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from solders.pubkey import Pubkey
-from solana.rpc.api import Client
 from datetime import datetime
 import pytz
 from typing import List, Optional
 from utility.logger import logger
-import time
+import asyncio
+from ..main import get_solana_manager
 
 router = APIRouter(
     prefix="/api/wallet",
@@ -34,14 +34,14 @@ async def get_transactions(request: TransactionRequest):
     try:
         logger.info(f"Processing transaction request for wallet: {request.wallet_address}")
         
-        client = Client("https://api.mainnet-beta.solana.com")
+        client = get_solana_manager().client
         try:
             pubkey = Pubkey.from_string(request.wallet_address)
         except ValueError as ve:
             logger.error(f"Invalid wallet address: {request.wallet_address}")
             raise HTTPException(status_code=400, detail="Invalid wallet address.")
         
-        response = client.get_signatures_for_address(pubkey, limit=request.limit)
+        response = await client.get_signatures_for_address(pubkey, limit=request.limit)
         
         if not response or not response.value:
             logger.info(f"No transactions found for wallet: {request.wallet_address}")
@@ -53,7 +53,7 @@ async def get_transactions(request: TransactionRequest):
             retry_delay = 1  # seconds
             for attempt in range(max_retries):
                 try:
-                    tx_response = client.get_transaction(
+                    tx_response = await client.get_transaction(
                         sig_info.signature,
                         encoding="jsonParsed",
                         max_supported_transaction_version=0
@@ -112,7 +112,7 @@ async def get_transactions(request: TransactionRequest):
                     logger.error(f"Error processing transaction {sig_info.signature}: {tx_error}")
                     if attempt < max_retries - 1:
                         logger.info(f"Retrying in {retry_delay} seconds...")
-                        time.sleep(retry_delay)
+                        await asyncio.sleep(retry_delay)
                     else:
                         logger.error(f"Max retries reached for transaction {sig_info.signature}")
         
@@ -123,3 +123,11 @@ async def get_transactions(request: TransactionRequest):
             status_code=500,
             detail=f"Failed to fetch transactions: {str(e)}"
         )
+
+
+@router.get("/transactions/status/{signature}")
+async def get_transaction_status(signature: str, wait: float = Query(0, ge=0, le=60)):
+    status = await get_solana_manager().confirmations.status(signature, wait)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Transaction is not being tracked")
+    return status
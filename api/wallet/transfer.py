@@ -62,7 +62,7 @@ async def send_discord_webhook(transaction_details: dict):
 @router.post("/transfer")
 async def transfer_sol(request: TransferRequest):
     try:
-        transaction_hash = send_sol(
+        transaction_hash = await send_sol(
             src_key=request.sender_private_key,
             dest_addr=request.receiver_address,
             amt_sol=request.amount
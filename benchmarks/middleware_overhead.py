@@ -0,0 +1,100 @@
+"""
+Per-request overhead of the request logging middleware.
+
+Compares a bare app, the previous pair of BaseHTTPMiddleware subclasses and
+RequestLogMiddleware, driving each in-process with concurrent httpx clients.
+
+    python -m benchmarks.middleware_overhead --requests 5000 --concurrency 50
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from middleware.requestlog import RequestLogMiddleware
+from utility.logshipper import log_shippers
+
+
+def make_method_middleware(method: str):
+    # Shape of the removed middleware/get.py and middleware/post.py.
+    class MethodRequestsMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request: Request, call_next):
+            client_ip = request.client.host if request.client else None
+            if request.method == method:
+                log_message = f"{method} request to {request.url.path} from IP: {client_ip}"
+                logging.getLogger("app_logger").info(log_message)
+                log_shippers[method].submit(log_message)
+            response = await call_next(request)
+            if response.status_code >= 400:
+                logging.getLogger("app_logger").error(f"Error {response.status_code} on {request.url.path}")
+            return response
+    return MethodRequestsMiddleware
+
+
+def build_app(variant: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"status": "ok"}
+
+    if variant == "base_http":
+        app.add_middleware(make_method_middleware("GET"))
+        app.add_middleware(make_method_middleware("POST"))
+    elif variant == "asgi":
+        app.add_middleware(RequestLogMiddleware)
+    return app
+
+
+async def run(app: FastAPI, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(100):
+            await client.get("/ping")
+
+        remaining = requests
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                response = await client.get("/ping")
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return (time.perf_counter() - started) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.getLogger("app_logger").setLevel(logging.WARNING)
+
+    results = {}
+    for variant in ("none", "base_http", "asgi"):
+        app = build_app(variant)
+        results[variant] = min(
+            asyncio.run(run(app, args.requests, args.concurrency)) for _ in range(args.rounds)
+        )
+
+    baseline = results["none"]
+    print(f"{'variant':<12}{'us/request':>12}{'overhead us':>14}")
+    for variant, seconds in results.items():
+        print(f"{variant:<12}{seconds * 1e6:>12.1f}{(seconds - baseline) * 1e6:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,128 @@
+"""
+Circulating supply with per-token capability caching.
+
+Operators record known burn and lock holders for a token with:
+
+    python -m core.calcsupply <chain> <address> --burn 0x... --lock 0x...
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime
+
+from web3.exceptions import BadFunctionCallOutput, ContractLogicError
+
+from database.database import db
 from utility.logger import logger
 
-async def calculate_circulating_supply(contract, total_supply: int) -> float:
+DEAD_ADDRESS = "0x000000000000000000000000000000000000dead"
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+OPTIONAL_SUPPLY_FUNCTIONS = ("lockedSupply", "reservedSupply")
+CAPABILITY_REPROBE_SECONDS = 7 * 86400
+CAPABILITY_CACHE_SECONDS = 600
+
+_capabilities = {}
+
+
+async def get_supply_capabilities(chain: str, address: str) -> dict:
+    key = (chain, address.lower())
+    cached = _capabilities.get(key)
+    if cached and time.time() - cached[0] < CAPABILITY_CACHE_SECONDS:
+        return cached[1]
+
+    doc = await db.token_capabilities.find_one({"chain": chain, "address": address.lower()}, {"_id": 0})
+    doc = doc or {"chain": chain, "address": address.lower()}
+    # Documents upserted by set_supply_addresses() carry no probe results yet.
+    doc.setdefault("functions", {})
+    _capabilities[key] = (time.time(), doc)
+    return doc
+
+
+async def set_supply_addresses(chain: str, address: str, burn_addresses: list = None, lock_addresses: list = None):
+    fields = {}
+    if burn_addresses is not None:
+        fields["burn_addresses"] = [a.lower() for a in burn_addresses]
+    if lock_addresses is not None:
+        fields["lock_addresses"] = [a.lower() for a in lock_addresses]
+    await db.token_capabilities.update_one(
+        {"chain": chain, "address": address.lower()},
+        {"$set": fields},
+        upsert=True
+    )
+    _capabilities.pop((chain, address.lower()), None)
+
+
+def needs_probe(capabilities: dict) -> bool:
+    probed_at = capabilities.get("probed_at")
+    if probed_at is None:
+        return True
+    # Jitter the re-probe so a whole token list probed together doesn't re-probe together.
+    max_age = CAPABILITY_REPROBE_SECONDS * random.uniform(0.9, 1.1)
+    return (datetime.utcnow() - probed_at).total_seconds() > max_age
+
+
+async def calculate_circulating_supply(contract, total_supply: int, chain: str) -> float:
     try:
-        DEAD_ADDRESS = "0x000000000000000000000000000000000000dead"
-        ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+        address = contract.address
+        capabilities = await get_supply_capabilities(chain, address)
+        probe = needs_probe(capabilities)
+
+        excluded_addresses = [DEAD_ADDRESS, ZERO_ADDRESS]
+        excluded_addresses += capabilities.get("burn_addresses", [])
+        excluded_addresses += capabilities.get("lock_addresses", [])
+        excluded_addresses = list(dict.fromkeys(excluded_addresses))
 
-        burned_tokens = await contract.functions.balanceOf(DEAD_ADDRESS).call()
-        zero_tokens = await contract.functions.balanceOf(ZERO_ADDRESS).call()
+        optional_functions = [
+            name for name in OPTIONAL_SUPPLY_FUNCTIONS
+            if probe or capabilities.get("functions", {}).get(name)
+        ]
 
-        try:
-            locked_tokens = await contract.functions.lockedSupply().call()
-        except Exception:
-            locked_tokens = 0
+        calls = [contract.functions.decimals().call()]
+        calls += [
+            contract.functions.balanceOf(contract.w3.to_checksum_address(holder)).call()
+            for holder in excluded_addresses
+        ]
+        calls += [getattr(contract.functions, name)().call() for name in optional_functions]
+        results = await asyncio.gather(*calls, return_exceptions=True)
 
-        try:
-            reserved_tokens = await contract.functions.reservedSupply().call()
-        except Exception:
-            reserved_tokens = 0
+        decimals, balances, optional_results = (
+            results[0],
+            results[1:1 + len(excluded_addresses)],
+            results[1 + len(excluded_addresses):],
+        )
+        for result in [decimals, *balances]:
+            if isinstance(result, Exception):
+                raise result
 
-        circulating = total_supply - (burned_tokens + zero_tokens + locked_tokens + reserved_tokens)
+        functions = dict(capabilities.get("functions", {}))
+        optional_tokens = 0
+        conclusive = True
+        for name, result in zip(optional_functions, optional_results):
+            if isinstance(result, (ContractLogicError, BadFunctionCallOutput)):
+                functions[name] = False
+            elif isinstance(result, Exception):
+                conclusive = False
+                logger.warning(f"Error calling {name} on token {address}: {str(result)}")
+            else:
+                functions[name] = True
+                optional_tokens += result
 
-        decimals = await contract.functions.decimals().call()
+        if probe:
+            # Only a probe where every call gave a definite answer starts the re-probe clock;
+            # after a transient error the next refresh probes again.
+            fields = {"functions": functions}
+            if conclusive:
+                fields["probed_at"] = datetime.utcnow()
+            capabilities.update(fields)
+            await db.token_capabilities.update_one(
+                {"chain": chain, "address": address.lower()},
+                {"$set": fields},
+                upsert=True
+            )
+
+        circulating = total_supply - (sum(balances) + optional_tokens)
         circulating_adjusted = float(circulating) / (10 ** decimals)
 
         return max(0.0, circulating_adjusted)
@@ -28,3 +130,20 @@ async def calculate_circulating_supply(contract, total_supply: int) -> float:
     except Exception as e:
         logger.error(f"Error calculating circulating supply: {str(e)}")
         return float(total_supply)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Set the burn and lock holders excluded from circulating supply")
+    parser.add_argument("chain")
+    parser.add_argument("address")
+    parser.add_argument("--burn", nargs="*", default=None, help="burn holder addresses; an empty list clears them")
+    parser.add_argument("--lock", nargs="*", default=None, help="lock holder addresses; an empty list clears them")
+    args = parser.parse_args()
+    if args.burn is None and args.lock is None:
+        parser.error("pass --burn and/or --lock")
+    asyncio.run(set_supply_addresses(args.chain, args.address, args.burn, args.lock))
+    logger.info(f"Updated supply addresses for {args.chain}:{args.address.lower()}")
+
+
+if __name__ == "__main__":
+    main()
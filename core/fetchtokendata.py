@@ -28,6 +28,12 @@ async def fetch_token_data(session: aiohttp.ClientSession, address: str, chain:
             {"constant": True, "inputs": [], "name": "decimals", "outputs": [{"name": "", "type": "uint8"}],
              "type": "function"},
             {"constant": True, "inputs": [], "name": "totalSupply", "outputs": [{"name": "", "type": "uint256"}],
+             "type": "function"},
+            {"constant": True, "inputs": [{"name": "account", "type": "address"}], "name": "balanceOf",
+             "outputs": [{"name": "", "type": "uint256"}], "type": "function"},
+            {"constant": True, "inputs": [], "name": "lockedSupply", "outputs": [{"name": "", "type": "uint256"}],
+             "type": "function"},
+            {"constant": True, "inputs": [], "name": "reservedSupply", "outputs": [{"name": "", "type": "uint256"}],
              "type": "function"}
         ]
 
@@ -42,6 +48,9 @@ async def fetch_token_data(session: aiohttp.ClientSession, address: str, chain:
                 f"https://api.coingecko.com/api/v3/simple/token_price/{chain}?contract_addresses={address}&vs_currencies=usd&include_24h_change=true") as response:
             price_data = await response.json()
 
+        usd_price = price_data.get(address.lower(), {}).get("usd", 0)
+        circulating_supply = await calculate_circulating_supply(contract, total_supply, chain)
+
         holders = await fetch_holders_count(session, address, chain)
         liquidity = await fetch_liquidity(session, address, chain)
         volume = await fetch_volume_24h(session, address, chain)
@@ -54,7 +63,7 @@ async def fetch_token_data(session: aiohttp.ClientSession, address: str, chain:
             "chain": chain,
             "decimals": decimals,
             "price": TokenPrice(
-                usd=price_data.get(address.lower(), {}).get("usd", 0),
+                usd=usd_price,
                 change_24h=price_data.get(address.lower(), {}).get("usd_24h_change", 0),
                 change_6h=await calculate_6h_change(session, address, chain)
             ),
@@ -65,9 +74,10 @@ async def fetch_token_data(session: aiohttp.ClientSession, address: str, chain:
             "makers_count": await fetch_makers_count(session, address, chain),
             "market_metrics": TokenMetrics(
                 total_supply=total_supply / (10 ** decimals),
-                circulating_supply=await calculate_circulating_supply(contract, total_supply),
+                circulating_supply=circulating_supply,
                 holders=holders,
-                market_cap=(total_supply / (10 ** decimals)) * price_data.get(address.lower(), {}).get("usd", 0)
+                market_cap=(total_supply / (10 ** decimals)) * usd_price,
+                circulating_market_cap=circulating_supply * usd_price
             ),
             "updated_at": datetime.utcnow()
         }
@@ -0,0 +1,142 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, Tuple
+
+import aiohttp
+import numpy as np
+from pymongo import UpdateOne
+
+from core.tokengeneration import tokens_generation
+from middleware.web3 import tokens_collection
+from utility.logger import logger
+
+PRICE_TICK_INTERVAL = 5
+UNIVERSE_RELOAD_SECONDS = 300
+PRICE_BATCH_SIZE = 100
+
+PRICE_FIELDS = {
+    "price": "price.usd",
+    "market_cap": "market_metrics.market_cap",
+    "circulating_market_cap": "market_metrics.circulating_market_cap",
+}
+
+
+class PriceTickEngine:
+    """Keeps supply and price columns for every token so a price tick is one array pass."""
+
+    def __init__(self):
+        self.keys = []
+        self.index: Dict[Tuple[str, str], int] = {}
+        self.total_supply = np.zeros(0)
+        self.circulating_supply = np.zeros(0)
+        self.columns = {name: np.zeros(0) for name in PRICE_FIELDS}
+        self.loaded_at = 0.0
+
+    def load_universe(self):
+        projection = {
+            "_id": 0, "chain": 1, "address": 1, "price.usd": 1,
+            "market_metrics.total_supply": 1, "market_metrics.circulating_supply": 1,
+            "market_metrics.market_cap": 1, "market_metrics.circulating_market_cap": 1,
+        }
+        docs = list(tokens_collection.find({}, projection))
+
+        def column(path):
+            values = []
+            for doc in docs:
+                value = doc
+                for part in path.split("."):
+                    value = (value or {}).get(part)
+                values.append(value if value is not None else np.nan)
+            return np.array(values, dtype=np.float64)
+
+        self.keys = [(doc["chain"], doc["address"]) for doc in docs]
+        self.index = {(chain, address.lower()): i for i, (chain, address) in enumerate(self.keys)}
+        self.total_supply = column("market_metrics.total_supply")
+        self.circulating_supply = column("market_metrics.circulating_supply")
+        self.columns = {name: column(path) for name, path in PRICE_FIELDS.items()}
+        self.loaded_at = time.time()
+        logger.info(f"Loaded {len(self.keys)} tokens for price ticks")
+
+    def apply_prices(self, prices: Dict[Tuple[str, str], float]) -> int:
+        positions, values = [], []
+        for (chain, address), usd in prices.items():
+            i = self.index.get((chain, address.lower()))
+            if i is not None:
+                positions.append(i)
+                values.append(usd)
+        if not positions:
+            return 0
+
+        price = self.columns["price"].copy()
+        price[np.array(positions)] = np.array(values, dtype=np.float64)
+        updated = {
+            "price": price,
+            "market_cap": self.total_supply * price,
+            "circulating_market_cap": self.circulating_supply * price,
+        }
+
+        # NaN != NaN, so compare with an explicit both-NaN check to avoid rewriting unknown values.
+        changed = {
+            name: ~((updated[name] == self.columns[name]) | (np.isnan(updated[name]) & np.isnan(self.columns[name])))
+            for name in PRICE_FIELDS
+        }
+        rows = np.flatnonzero(np.logical_or.reduce(list(changed.values())))
+        if rows.size == 0:
+            return 0
+
+        now = datetime.utcnow()
+        operations = []
+        for i in rows:
+            fields = {
+                PRICE_FIELDS[name]: float(updated[name][i])
+                for name in PRICE_FIELDS
+                if changed[name][i] and not np.isnan(updated[name][i])
+            }
+            if not fields:
+                continue
+            fields["price_updated_at"] = now
+            chain, address = self.keys[i]
+            operations.append(UpdateOne({"address": address, "chain": chain}, {"$set": fields, "$inc": {"version": 1}}))
+
+        if operations:
+            tokens_collection.bulk_write(operations, ordered=False)
+        self.columns = updated
+        return len(operations)
+
+    async def fetch_prices(self, session: aiohttp.ClientSession) -> Dict[Tuple[str, str], float]:
+        by_chain = {}
+        for chain, address in self.keys:
+            by_chain.setdefault(chain, []).append(address)
+
+        prices = {}
+        for chain, addresses in by_chain.items():
+            for start in range(0, len(addresses), PRICE_BATCH_SIZE):
+                batch = addresses[start:start + PRICE_BATCH_SIZE]
+                async with session.get(
+                        f"https://api.coingecko.com/api/v3/simple/token_price/{chain}",
+                        params={"contract_addresses": ",".join(batch), "vs_currencies": "usd"}) as response:
+                    price_data = await response.json()
+                for address in batch:
+                    usd = price_data.get(address.lower(), {}).get("usd")
+                    if usd is not None:
+                        prices[(chain, address)] = float(usd)
+        return prices
+
+    async def run(self):
+        async with aiohttp.ClientSession() as session:
+            while True:
+                try:
+                    if time.time() - self.loaded_at > UNIVERSE_RELOAD_SECONDS:
+                        self.load_universe()
+                    prices = await self.fetch_prices(session)
+                    updated = self.apply_prices(prices)
+                    if updated:
+                        tokens_generation.mark_changed()
+                        logger.info(f"Price tick updated {updated} tokens")
+                except Exception as e:
+                    logger.error(f"Error in price tick: {str(e)}")
+                await asyncio.sleep(PRICE_TICK_INTERVAL)
+
+
+price_ticks = PriceTickEngine()
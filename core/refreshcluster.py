@@ -0,0 +1,316 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+from typing import Optional
+
+from core.refreshqueue import REFRESH_MIN_INTERVAL, RefreshJob, load_job, refresh_job_cache_key, store_job
+from core.updatesingletoken import update_single_token
+from database.database import get_redis
+from database.redis import redis_config
+from middleware.web3 import tokens_collection
+from utility.logger import logger
+
+REFRESH_STREAM = "refresh:stream"
+REFRESH_GROUP = "refresh-workers"
+# Holds the manual job id for a queued token, or "1" for a scheduled sweep entry.
+REFRESH_QUEUED_KEY = "refresh:queued:{}:{}"
+# Markers expire on their own so a lost stream entry can't block a token forever.
+REFRESH_QUEUED_TTL = 600
+SWEEP_MARKER = "1"
+# Last finished manual job per token; resubmits within REFRESH_MIN_INTERVAL get it back.
+REFRESH_LAST_KEY = "refresh:last:{}:{}"
+REFRESH_STREAM_MAXLEN = 100000
+SCHEDULER_LEASE = "refresh:scheduler:leader"
+SCHEDULER_INTERVAL = 300
+LEASE_TTL_MS = 15000
+ENQUEUE_BATCH = 500
+CONSUMER_CONCURRENCY = 8
+RECLAIM_IDLE_MS = 120000
+RECLAIM_INTERVAL = 30
+
+RENEW_LEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_LEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+ENQUEUE_SCRIPT = """
+if redis.call('set', KEYS[2], 1, 'NX', 'EX', ARGV[4]) then
+    return redis.call('xadd', KEYS[1], 'MAXLEN', '~', ARGV[3], '*', 'chain', ARGV[1], 'address', ARGV[2])
+end
+return false
+"""
+
+# Returns the job id that will cover the refresh: a recent or queued job, or ARGV[5] when newly queued.
+SUBMIT_SCRIPT = """
+local last = redis.call('get', KEYS[3])
+if last then
+    return last
+end
+local queued = redis.call('get', KEYS[2])
+if queued and queued ~= ARGV[6] then
+    return queued
+end
+if queued then
+    redis.call('set', KEYS[2], ARGV[5], 'KEEPTTL')
+    return ARGV[5]
+end
+redis.call('set', KEYS[2], ARGV[5], 'EX', ARGV[4])
+redis.call('xadd', KEYS[1], 'MAXLEN', '~', ARGV[3], '*', 'chain', ARGV[1], 'address', ARGV[2])
+return ARGV[5]
+"""
+
+
+def queued_key(chain: str, address: str) -> str:
+    return REFRESH_QUEUED_KEY.format(chain, address.lower())
+
+
+def node_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class LeaderLease:
+    def __init__(self, redis, name: str, holder: str, ttl_ms: int = LEASE_TTL_MS):
+        self.redis = redis
+        self.name = name
+        self.ttl_ms = ttl_ms
+        self.holder = holder
+        self.is_leader = False
+        self.renew_script = redis.register_script(RENEW_LEASE_SCRIPT)
+        self.release_script = redis.register_script(RELEASE_LEASE_SCRIPT)
+
+    async def acquire_or_renew(self) -> bool:
+        try:
+            if self.is_leader:
+                self.is_leader = bool(await self.renew_script(keys=[self.name], args=[self.holder, self.ttl_ms]))
+            if not self.is_leader:
+                self.is_leader = bool(await self.redis.set(self.name, self.holder, nx=True, px=self.ttl_ms))
+        except Exception as e:
+            logger.error(f"Error renewing lease {self.name}: {str(e)}")
+            self.is_leader = False
+        return self.is_leader
+
+    async def release(self):
+        if self.is_leader:
+            try:
+                await self.release_script(keys=[self.name], args=[self.holder])
+            except Exception as e:
+                logger.error(f"Error releasing lease {self.name}: {str(e)}")
+        self.is_leader = False
+
+
+class RefreshCluster:
+    """Leader-scheduled token refreshes, executed by every process through a stream consumer group."""
+
+    def __init__(self, concurrency: int = CONSUMER_CONCURRENCY):
+        self.concurrency = concurrency
+        self.consumer = node_name()
+        self.redis = None
+        self.lease = None
+        self.enqueue_script = None
+        self.submit_script = None
+        self.slots = None
+        self.tasks = []
+        self.processing = set()
+        self.leader_tasks = []
+        self.leader_running = []
+
+    async def start(self, leader_tasks=()):
+        redis_config = await get_redis()
+        self.redis = redis_config.client
+        self.lease = LeaderLease(self.redis, SCHEDULER_LEASE, self.consumer)
+        self.enqueue_script = self.redis.register_script(ENQUEUE_SCRIPT)
+        self.submit_script = self.redis.register_script(SUBMIT_SCRIPT)
+        self.slots = asyncio.Semaphore(self.concurrency)
+        self.leader_tasks = list(leader_tasks)
+
+        try:
+            await self.redis.xgroup_create(REFRESH_STREAM, REFRESH_GROUP, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+        self.tasks = [
+            asyncio.create_task(self._lease_loop()),
+            asyncio.create_task(self._consume_loop()),
+            asyncio.create_task(self._reclaim_loop()),
+        ]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        # Unacknowledged entries stay pending in the stream and are reclaimed by another node.
+        for task in self.processing:
+            task.cancel()
+        await asyncio.gather(*self.processing, return_exceptions=True)
+        self.processing.clear()
+        # Leader-only loops must be down before the lease is released to another node.
+        await self._stop_leader_tasks()
+        if self.lease:
+            await self.lease.release()
+
+    @property
+    def running(self) -> bool:
+        return bool(self.tasks)
+
+    async def enqueue(self, chain: str, address: str) -> str:
+        """Queue a manual refresh on the stream and return the id of the job that covers it."""
+        job = RefreshJob(chain, address)
+        # Written before queueing so a consumer never updates a job that doesn't exist yet.
+        await store_job(job.to_dict())
+        job_id = await self.submit_script(
+            keys=[REFRESH_STREAM, queued_key(chain, address), REFRESH_LAST_KEY.format(chain, address.lower())],
+            args=[chain, address, REFRESH_STREAM_MAXLEN, REFRESH_QUEUED_TTL, job.id, SWEEP_MARKER],
+        )
+        if job_id != job.id:
+            await redis_config.delete(refresh_job_cache_key(job.id))
+        return job_id
+
+    async def enqueue_all(self) -> int:
+        count = 0
+        pipe = self.redis.pipeline(transaction=False)
+        for token in tokens_collection.find({}, {"_id": 0, "chain": 1, "address": 1}):
+            await self.enqueue_script(
+                keys=[REFRESH_STREAM, queued_key(token["chain"], token["address"])],
+                args=[token["chain"], token["address"], REFRESH_STREAM_MAXLEN, REFRESH_QUEUED_TTL],
+                client=pipe,
+            )
+            count += 1
+            if count % ENQUEUE_BATCH == 0:
+                await pipe.execute()
+        await pipe.execute()
+        return count
+
+    async def _stop_leader_tasks(self):
+        for task in self.leader_running:
+            task.cancel()
+        await asyncio.gather(*self.leader_running, return_exceptions=True)
+        self.leader_running = []
+
+    async def _lease_loop(self):
+        next_schedule = 0.0
+        loop = asyncio.get_running_loop()
+        while True:
+            was_leader = self.lease.is_leader
+            is_leader = await self.lease.acquire_or_renew()
+
+            if is_leader and not was_leader:
+                logger.info(f"{self.consumer} acquired the refresh scheduler lease")
+                self.leader_running = [asyncio.create_task(run()) for run in self.leader_tasks]
+            elif was_leader and not is_leader:
+                logger.warning(f"{self.consumer} lost the refresh scheduler lease")
+                await self._stop_leader_tasks()
+
+            if is_leader and loop.time() >= next_schedule:
+                try:
+                    count = await self.enqueue_all()
+                    logger.info(f"Scheduled refresh for {count} tokens")
+                except Exception as e:
+                    logger.error(f"Error scheduling token refresh: {str(e)}")
+                next_schedule = loop.time() + SCHEDULER_INTERVAL
+
+            await asyncio.sleep(self.lease.ttl_ms / 3000)
+
+    async def _consume_loop(self):
+        while True:
+            await self.slots.acquire()
+            free = 1
+            while free < self.concurrency and not self.slots.locked():
+                await self.slots.acquire()
+                free += 1
+
+            try:
+                response = await self.redis.xreadgroup(
+                    REFRESH_GROUP, self.consumer, {REFRESH_STREAM: ">"}, count=free, block=5000
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error reading refresh stream: {str(e)}")
+                response = None
+                await asyncio.sleep(1)
+
+            entries = [entry for _, messages in response or [] for entry in messages]
+            for entry in entries:
+                self._spawn(entry)
+            for _ in range(free - len(entries)):
+                self.slots.release()
+
+    async def _reclaim_loop(self):
+        while True:
+            await asyncio.sleep(RECLAIM_INTERVAL)
+            try:
+                start = "0-0"
+                while True:
+                    next_start, messages, *_ = await self.redis.xautoclaim(
+                        REFRESH_STREAM, REFRESH_GROUP, self.consumer,
+                        min_idle_time=RECLAIM_IDLE_MS, start_id=start, count=self.concurrency,
+                    )
+                    for entry in messages:
+                        await self.slots.acquire()
+                        self._spawn(entry)
+                    if next_start in ("0-0", b"0-0"):
+                        break
+                    start = next_start
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error reclaiming refresh stream entries: {str(e)}")
+
+    def _spawn(self, entry):
+        task = asyncio.create_task(self._process(*entry))
+        self.processing.add(task)
+        task.add_done_callback(self.processing.discard)
+
+    async def _update_job(self, job_id: Optional[str], **fields):
+        if not job_id or job_id == SWEEP_MARKER:
+            return
+        job = await load_job(job_id)
+        if job is not None:
+            job.update(fields)
+            await store_job(job)
+
+    async def _process(self, entry_id: str, fields: dict):
+        try:
+            if fields:
+                chain, address = fields["chain"], fields["address"]
+                marker = queued_key(chain, address)
+                await self._update_job(await self.redis.get(marker), status="running", started_at=time.time())
+                error = None
+                try:
+                    await update_single_token(chain, address)
+                except Exception as e:
+                    error = str(e)
+                    logger.error(f"Error updating token {address}: {error}")
+
+                # Read the marker again: a manual job may have attached to this entry while it ran.
+                pipe = self.redis.pipeline(transaction=True)
+                pipe.get(marker)
+                pipe.delete(marker)
+                job_id, _ = await pipe.execute()
+                await self._update_job(
+                    job_id, status="failed" if error else "done", error=error, finished_at=time.time()
+                )
+                if job_id and job_id != SWEEP_MARKER:
+                    await self.redis.set(REFRESH_LAST_KEY.format(chain, address.lower()), job_id,
+                                         ex=REFRESH_MIN_INTERVAL)
+            await self.redis.xack(REFRESH_STREAM, REFRESH_GROUP, entry_id)
+        except Exception as e:
+            logger.error(f"Error acknowledging refresh entry {entry_id}: {str(e)}")
+        finally:
+            self.slots.release()
+
+
+refresh_cluster = RefreshCluster()
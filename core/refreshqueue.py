@@ -0,0 +1,168 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from core.updatesingletoken import update_single_token
+from database.redis import CACHE_KEY_PREFIX, redis_config
+from utility.logger import logger
+
+REFRESH_WORKERS = 4
+REFRESH_MIN_INTERVAL = 60
+REFRESH_JOB_HISTORY = 1000
+REFRESH_JOB_NAMESPACE = "refreshjob"
+REFRESH_JOB_TTL = 3600
+REFRESH_JOB_POLL_INTERVAL = 0.5
+FINISHED_STATUSES = ("done", "failed")
+
+redis_config.configure_namespace(REFRESH_JOB_NAMESPACE, l1_max_entries=1000, l1_ttl=1)
+
+
+def refresh_job_cache_key(job_id: str) -> str:
+    return f"{CACHE_KEY_PREFIX}:{REFRESH_JOB_NAMESPACE}:v1:{job_id}"
+
+
+async def store_job(job: dict):
+    await redis_config.set(refresh_job_cache_key(job["job_id"]), job, expire=REFRESH_JOB_TTL)
+
+
+async def load_job(job_id: str) -> Optional[dict]:
+    return await redis_config.get(refresh_job_cache_key(job_id))
+
+
+class RefreshJob:
+    def __init__(self, chain: str, address: str):
+        self.id = str(uuid.uuid4())
+        self.chain = chain
+        self.address = address
+        self.status = "pending"
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done = asyncio.Event()
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.chain, self.address.lower()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "chain": self.chain,
+            "address": self.address,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class RefreshQueue:
+    """Keyed refresh queue: one pending job per token, throttled per token."""
+
+    def __init__(self, workers: int = REFRESH_WORKERS, min_interval: float = REFRESH_MIN_INTERVAL):
+        self.workers = workers
+        self.min_interval = min_interval
+        self.queue: asyncio.Queue = None
+        self.active: Dict[Tuple[str, str], RefreshJob] = {}
+        # Last finished job per token, successful or not; the throttle applies either way.
+        self.last_finished: Dict[Tuple[str, str], RefreshJob] = {}
+        self.jobs: "OrderedDict[str, RefreshJob]" = OrderedDict()
+        self.tasks = []
+
+    def start(self):
+        if self.tasks:
+            return
+        self.queue = asyncio.Queue()
+        self.tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    async def submit(self, chain: str, address: str) -> RefreshJob:
+        self.start()
+        key = (chain, address.lower())
+
+        job = self.active.get(key)
+        if job is not None:
+            return job
+
+        last = self.last_finished.get(key)
+        if last is not None and time.time() - last.finished_at < self.min_interval:
+            return last
+
+        job = RefreshJob(chain, address)
+        self.active[key] = job
+        self._remember(job)
+        await store_job(job.to_dict())
+        self.queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[RefreshJob]:
+        return self.jobs.get(job_id)
+
+    async def wait(self, job: RefreshJob, timeout: float) -> bool:
+        if timeout <= 0:
+            return job.done.is_set()
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def status(self, job_id: str, wait: float = 0) -> Optional[dict]:
+        """Job state as seen by any worker; only the submitting process holds the job in memory."""
+        job = self.get(job_id)
+        if job is not None:
+            await self.wait(job, wait)
+            return job.to_dict()
+
+        status = await load_job(job_id)
+        deadline = time.monotonic() + wait
+        while status is not None and status["status"] not in FINISHED_STATUSES and time.monotonic() < deadline:
+            await asyncio.sleep(min(REFRESH_JOB_POLL_INTERVAL, max(0.0, deadline - time.monotonic())))
+            status = await load_job(job_id) or status
+        return status
+
+    def _remember(self, job: RefreshJob):
+        self.jobs[job.id] = job
+        while len(self.jobs) > REFRESH_JOB_HISTORY:
+            self.jobs.popitem(last=False)
+
+    def _throttle(self, job: RefreshJob):
+        self.last_finished[job.key] = job
+        if len(self.last_finished) > REFRESH_JOB_HISTORY:
+            cutoff = time.time() - self.min_interval
+            self.last_finished = {
+                key: last for key, last in self.last_finished.items() if last.finished_at >= cutoff
+            }
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                await store_job(job.to_dict())
+                await update_single_token(job.chain, job.address)
+                job.status = "done"
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+                logger.error(f"Error refreshing token {job.address}: {str(e)}")
+            finally:
+                job.finished_at = time.time()
+                self._throttle(job)
+                self.active.pop(job.key, None)
+                job.done.set()
+                self.queue.task_done()
+                await store_job(job.to_dict())
+
+
+refresh_queue = RefreshQueue()
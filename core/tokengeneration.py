@@ -0,0 +1,69 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Optional, Tuple
+
+from database.redis import redis_config
+from utility.logger import logger
+
+TOKENS_GENERATION_KEY = "discovery:generation"
+TOKENS_LIST_NAMESPACE = "discovery.tokens"
+# Token writes move list views at most this often; a refresh sweep writes several tokens a second.
+TOKENS_GENERATION_INTERVAL = 60
+
+
+async def bump_tokens_generation():
+    try:
+        # Drop cached lists before publishing the new generation, so a new ETag never carries an old list.
+        await redis_config.invalidate_namespace(TOKENS_LIST_NAMESPACE)
+        pipe = redis_config.client.pipeline(transaction=True)
+        pipe.hincrby(TOKENS_GENERATION_KEY, "n", 1)
+        pipe.hset(TOKENS_GENERATION_KEY, "at", datetime.utcnow().isoformat())
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Error bumping tokens generation: {str(e)}")
+
+
+async def get_tokens_generation() -> Tuple[Optional[int], Optional[datetime]]:
+    """Cheap aggregate version for token lists: bumped at most once per interval after token writes."""
+    try:
+        generation = await redis_config.client.hgetall(TOKENS_GENERATION_KEY)
+    except Exception:
+        return None, None
+    if not generation:
+        return 0, None
+    return int(generation["n"]), datetime.fromisoformat(generation["at"])
+
+
+class TokensGeneration:
+    """Coalesces token writes into one trailing generation bump per interval in this process."""
+
+    def __init__(self, interval: float = TOKENS_GENERATION_INTERVAL):
+        self.interval = interval
+        self.bumped_at = 0.0
+        self.task = None
+
+    def mark_changed(self):
+        if self.task is None:
+            delay = max(0.0, self.bumped_at + self.interval - time.monotonic())
+            self.task = asyncio.create_task(self.bump_after(delay))
+
+    async def bump_after(self, delay: float):
+        await asyncio.sleep(delay)
+        # Writes landing during the bump schedule the next one.
+        self.task = None
+        self.bumped_at = time.monotonic()
+        await bump_tokens_generation()
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+            await bump_tokens_generation()
+
+
+tokens_generation = TokensGeneration()
@@ -1,6 +1,7 @@
 import aiohttp
 from core.fetchtokendata import fetch_token_data
 from api.discovery.discovery import tokens_collection
+from core.tokengeneration import tokens_generation
 
 
 async def update_single_token(chain: str, address: str):
@@ -8,6 +9,7 @@ async def update_single_token(chain: str, address: str):
         token_data = await fetch_token_data(session, address, chain)
         tokens_collection.update_one(
             {"address": address, "chain": chain},
-            {"$set": token_data},
+            {"$set": token_data, "$inc": {"version": 1}},
             upsert=True
-        )
\ No newline at end of file
+        )
+        tokens_generation.mark_changed()
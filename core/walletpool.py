@@ -0,0 +1,128 @@
+import asyncio
+import json
+import os
+from typing import List, Optional
+
+from cryptography.fernet import Fernet, InvalidToken
+from prometheus_client import Counter, Gauge
+
+from database.redis import redis_config
+from utility import cputasks
+from utility.cpuexecutor import cpu_executor
+from utility.logger import logger
+
+WALLET_POOL_KEY = "walletpool:wallets"
+WALLET_POOL_LOCK = "walletpool:refill"
+WALLET_POOL_ENCRYPTION_KEY = os.getenv("WALLET_POOL_ENCRYPTION_KEY", "")
+WALLET_POOL_LOW_WATER = int(os.getenv("WALLET_POOL_LOW_WATER", "50"))
+WALLET_POOL_HIGH_WATER = int(os.getenv("WALLET_POOL_HIGH_WATER", "500"))
+REFILL_CHUNK_SIZE = 16
+REFILL_CHECK_INTERVAL = 30
+REFILL_LOCK_TIMEOUT = 120
+
+POOL_SIZE = Gauge("wallet_pool_size", "Pre-generated wallets available", multiprocess_mode="liveall")
+POOL_LOW_WATER = Gauge("wallet_pool_low_water", "Pool size that triggers a refill", multiprocess_mode="liveall")
+POOL_HIGH_WATER = Gauge("wallet_pool_high_water", "Pool size a refill stops at", multiprocess_mode="liveall")
+POOL_REQUESTS = Counter("wallet_pool_requests_total", "Wallets requested from the pool", ["result"])
+POOL_GENERATED = Counter("wallet_pool_generated_total", "Wallets generated into the pool")
+
+
+class WalletPool:
+    """Redis list of Fernet-encrypted, pre-generated wallets refilled in the background."""
+
+    def __init__(self, encryption_key: str = WALLET_POOL_ENCRYPTION_KEY,
+                 low_water: int = WALLET_POOL_LOW_WATER, high_water: int = WALLET_POOL_HIGH_WATER):
+        # Without a key the pool stays disabled rather than storing private keys in clear text.
+        self.fernet = Fernet(encryption_key) if encryption_key else None
+        self.low_water = low_water
+        self.high_water = high_water
+        self.refill_needed = asyncio.Event()
+        self.task = None
+        POOL_LOW_WATER.set(low_water)
+        POOL_HIGH_WATER.set(high_water)
+
+    @property
+    def enabled(self) -> bool:
+        return self.fernet is not None
+
+    def start(self):
+        if not self.enabled:
+            logger.warning("Wallet pool disabled: WALLET_POOL_ENCRYPTION_KEY is not set")
+            return
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def encrypt(self, wallet: dict) -> str:
+        return self.fernet.encrypt(json.dumps(wallet).encode()).decode()
+
+    def decrypt(self, token: str) -> Optional[dict]:
+        try:
+            return json.loads(self.fernet.decrypt(token.encode()))
+        except InvalidToken:
+            logger.error("Discarding wallet pool entry that failed to decrypt")
+            return None
+
+    async def take(self, count: int = 1) -> List[dict]:
+        if not self.enabled:
+            return []
+        try:
+            pipe = redis_config.client.pipeline(transaction=True)
+            pipe.lpop(WALLET_POOL_KEY, count)
+            pipe.llen(WALLET_POOL_KEY)
+            tokens, remaining = await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error taking wallets from pool: {str(e)}")
+            return []
+
+        wallets = [wallet for wallet in map(self.decrypt, tokens or []) if wallet is not None]
+        POOL_REQUESTS.labels("hit").inc(len(wallets))
+        POOL_REQUESTS.labels("miss").inc(count - len(wallets))
+        POOL_SIZE.set(remaining)
+        if remaining < self.low_water:
+            self.refill_needed.set()
+        return wallets
+
+    async def refill(self):
+        lock = await redis_config.acquire_lock(WALLET_POOL_LOCK, REFILL_LOCK_TIMEOUT)
+        if lock is None:
+            return
+        try:
+            size = await redis_config.client.llen(WALLET_POOL_KEY)
+            while size < self.high_water:
+                chunk = min(REFILL_CHUNK_SIZE, self.high_water - size)
+                # Background refills yield to request traffic instead of competing for admission.
+                if not cpu_executor.has_capacity(cpu_executor.max_queue // 2):
+                    break
+                wallets = await cpu_executor.run(cputasks.generate_wallets, chunk)
+                size = await redis_config.client.rpush(WALLET_POOL_KEY, *map(self.encrypt, wallets))
+                POOL_GENERATED.inc(len(wallets))
+            POOL_SIZE.set(size)
+        finally:
+            await redis_config.release_lock(WALLET_POOL_LOCK, lock)
+
+    async def run(self):
+        while True:
+            try:
+                size = await redis_config.client.llen(WALLET_POOL_KEY)
+                POOL_SIZE.set(size)
+                if size < self.low_water:
+                    await self.refill()
+            except Exception as e:
+                logger.error(f"Error refilling wallet pool: {str(e)}")
+            self.refill_needed.clear()
+            try:
+                await asyncio.wait_for(self.refill_needed.wait(), REFILL_CHECK_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+
+wallet_pool = WalletPool()
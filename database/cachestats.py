@@ -0,0 +1,109 @@
+import random
+import time
+from collections import Counter, defaultdict
+
+LATENCY_BUCKETS_MS = (0.1, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+KEY_SAMPLE_RATE = 0.01
+KEY_SAMPLE_LIMIT = 10000
+TOP_KEYS = 20
+
+
+class NamespaceStats:
+    def __init__(self):
+        self.counts = Counter()
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.latency_count = 0
+        self.latency_sum_ms = 0.0
+        self.latency_max_ms = 0.0
+        self.size_count = 0
+        self.size_sum = 0
+        self.size_max = 0
+        self.compute_count = 0
+        self.compute_sum_ms = 0.0
+
+    def observe_compute(self, seconds: float):
+        self.compute_count += 1
+        self.compute_sum_ms += seconds * 1000
+
+    def observe_latency(self, seconds: float):
+        ms = seconds * 1000
+        self.latency_count += 1
+        self.latency_sum_ms += ms
+        self.latency_max_ms = max(self.latency_max_ms, ms)
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if ms <= bound:
+                self.latency_buckets[i] += 1
+                return
+        self.latency_buckets[-1] += 1
+
+    def observe_size(self, size: int):
+        self.size_count += 1
+        self.size_sum += size
+        self.size_max = max(self.size_max, size)
+
+    def snapshot(self) -> dict:
+        lookups = self.counts["l1_hit"] + self.counts["hit"] + self.counts["miss"]
+        hits = self.counts["l1_hit"] + self.counts["hit"]
+        return {
+            "counts": dict(self.counts),
+            "hit_ratio": round(hits / lookups, 4) if lookups else None,
+            "latency_ms": {
+                "count": self.latency_count,
+                "avg": round(self.latency_sum_ms / self.latency_count, 3) if self.latency_count else None,
+                "max": round(self.latency_max_ms, 3),
+                "buckets": dict(zip([str(b) for b in LATENCY_BUCKETS_MS] + ["+Inf"], self.latency_buckets)),
+            },
+            "value_bytes": {
+                "count": self.size_count,
+                "avg": round(self.size_sum / self.size_count) if self.size_count else None,
+                "max": self.size_max,
+            },
+            "compute_ms": {
+                "count": self.compute_count,
+                "avg": round(self.compute_sum_ms / self.compute_count, 3) if self.compute_count else None,
+            },
+        }
+
+
+class CacheStats:
+    """Per-namespace cache counters plus a sampled view of the busiest keys."""
+
+    def __init__(self, sample_rate: float = KEY_SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.namespaces = defaultdict(NamespaceStats)
+        self.key_samples = Counter()
+        self.started_at = time.time()
+
+    def record(self, namespace: str, event: str, latency: float = None, size: int = None,
+               compute_time: float = None, count: int = 1):
+        stats = self.namespaces[namespace]
+        stats.counts[event] += count
+        if latency is not None:
+            stats.observe_latency(latency)
+        if size is not None:
+            stats.observe_size(size)
+        if compute_time is not None:
+            stats.observe_compute(compute_time)
+
+    def sample_key(self, key: str):
+        if random.random() >= self.sample_rate:
+            return
+        self.key_samples[key] += 1
+        if len(self.key_samples) > KEY_SAMPLE_LIMIT:
+            self.key_samples = Counter(dict(self.key_samples.most_common(KEY_SAMPLE_LIMIT // 10)))
+
+    def snapshot(self) -> dict:
+        return {
+            "uptime_seconds": round(time.time() - self.started_at),
+            "namespaces": {name: stats.snapshot() for name, stats in self.namespaces.items()},
+            "top_keys": {
+                "sample_rate": self.sample_rate,
+                "keys": [
+                    {"key": key, "estimated_accesses": round(count / self.sample_rate)}
+                    for key, count in self.key_samples.most_common(TOP_KEYS)
+                ],
+            },
+        }
+
+
+cache_stats = CacheStats()
@@ -0,0 +1,93 @@
+import json
+import zlib
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+# Encoded values start with a zero byte, which JSON text never does, followed by
+# one byte naming the codec and one naming the compression.
+HEADER_MARKER = b"\x00"
+HEADER_SIZE = 3
+
+CODECS = {
+    "json": (1, lambda value: json.dumps(value).encode(), json.loads),
+}
+if orjson is not None:
+    CODECS["orjson"] = (
+        2,
+        lambda value: orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS),
+        orjson.loads,
+    )
+if msgpack is not None:
+    CODECS["msgpack"] = (
+        3,
+        lambda value: msgpack.packb(value, use_bin_type=True),
+        lambda data: msgpack.unpackb(data, raw=False),
+    )
+
+COMPRESSIONS = {
+    "none": (0, lambda data: data, lambda data: data),
+    "zlib": (1, lambda data: zlib.compress(data, 6), zlib.decompress),
+}
+if zstandard is not None:
+    COMPRESSIONS["zstd"] = (
+        2,
+        lambda data: zstandard.ZstdCompressor(level=3).compress(data),
+        lambda data: zstandard.ZstdDecompressor().decompress(data),
+    )
+if lz4_frame is not None:
+    COMPRESSIONS["lz4"] = (3, lz4_frame.compress, lz4_frame.decompress)
+
+CODECS_BY_ID = {codec_id: loads for codec_id, _, loads in CODECS.values()}
+COMPRESSIONS_BY_ID = {compression_id: decompress for compression_id, _, decompress in COMPRESSIONS.values()}
+
+
+def resolve_codec(name: str) -> str:
+    if name in CODECS:
+        return name
+    return "orjson" if "orjson" in CODECS else "json"
+
+
+def resolve_compression(name: str) -> str:
+    if name in COMPRESSIONS:
+        return name
+    return "zlib" if name != "none" else "none"
+
+
+def encode(value: Any, codec: str = "json", compression: str = "none", threshold: int = 1024) -> bytes:
+    codec = resolve_codec(codec)
+    codec_id, dumps, _ = CODECS[codec]
+    payload = dumps(value)
+
+    compression = resolve_compression(compression) if len(payload) >= threshold else "none"
+    compression_id, compress, _ = COMPRESSIONS[compression]
+    return HEADER_MARKER + bytes((codec_id, compression_id)) + compress(payload)
+
+
+def decode(data: bytes) -> Any:
+    if not data.startswith(HEADER_MARKER):
+        return json.loads(data)
+    codec_id, compression_id = data[1], data[2]
+    decompress = COMPRESSIONS_BY_ID.get(compression_id)
+    loads = CODECS_BY_ID.get(codec_id)
+    if decompress is None or loads is None:
+        raise ValueError(f"Unsupported cache encoding: codec {codec_id}, compression {compression_id}")
+    return loads(decompress(data[HEADER_SIZE:]))
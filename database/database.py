@@ -15,6 +15,7 @@ class Database:
         self.pairs = None
         self.users = None
         self.sessions = None
+        self.token_capabilities = None
 
     async def initialize(self):
         try:
@@ -27,6 +28,7 @@ class Database:
             self.pairs = self.db.pairs
             self.users = self.db.users
             self.sessions = self.db.sessions
+            self.token_capabilities = self.db.token_capabilities
 
             await self.users.create_index([("email", ASCENDING)], unique=True)
             await self.users.create_index([("username", ASCENDING)], unique=True)
@@ -46,6 +48,10 @@ class Database:
             await self.tokens.create_index([("address", ASCENDING)], unique=True)
             await self.tokens.create_index([("symbol", ASCENDING)])
             await self.pairs.create_index([("address", ASCENDING)], unique=True)
+            await self.token_capabilities.create_index(
+                [("chain", ASCENDING), ("address", ASCENDING)],
+                unique=True
+            )
             
             await self.client.admin.command('ping')
             return self
@@ -84,6 +84,7 @@ class TokenMetrics(BaseModel):
     circulating_supply: float
     holders: int
     market_cap: float
+    circulating_market_cap: Optional[float] = None
 
 class Token(BaseModel):
     address: str
@@ -123,6 +124,9 @@ class WalletResponse(BaseModel):
 class PhraseRequest(BaseModel):
     phrase: str
 
+class PhrasesRequest(BaseModel):
+    phrases: List[str] = Field(..., min_length=1, max_length=100)
+
 
 class TokenData(BaseModel):
     pubkey: str
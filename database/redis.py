@@ -1,7 +1,144 @@
 from redis.asyncio import Redis
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from functools import wraps
+from datetime import date, datetime
+from enum import Enum
+import asyncio
+import hashlib
+import inspect
 import json
-from typing import Optional, Any
+import math
+import random
+import secrets
+import time
+from typing import Dict, Iterable, List, Optional, Any
+
+from fastapi.params import Depends
+from pydantic import BaseModel
+from starlette.background import BackgroundTasks
+from starlette.requests import HTTPConnection
+from starlette.responses import Response
+
+from utility.logger import logger
+from . import codecs
+from .cachestats import cache_stats
+
+CACHE_KEY_PREFIX = "cache"
+NAMESPACE_VERSION_TTL = 5
+IGNORED_KEY_TYPES = (HTTPConnection, Response, BackgroundTasks, Depends)
+LOCK_POLL_INTERVAL = 0.05
+INVALIDATION_CHANNEL = "cache:invalidate"
+BATCH_CHUNK_SIZE = 500
+ERROR_LOG_INTERVAL = 60
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+@dataclass
+class NamespaceConfig:
+    l1_max_entries: int = 1024
+    l1_ttl: float = 30
+    codec: str = "orjson"
+    compression: str = "zstd"
+    compression_threshold: int = 1024
+
+
+def key_namespace(key: str) -> str:
+    if key.startswith(f"{CACHE_KEY_PREFIX}:") and key.count(":") >= 3:
+        return key[len(CACHE_KEY_PREFIX) + 1:].rsplit(":", 2)[0]
+    return "default"
+
+
+class LocalCache:
+    """Size-bounded LRU with per-entry TTL, partitioned by namespace."""
+
+    def __init__(self):
+        self.namespaces = {}
+
+    def get(self, key: str, namespace: str):
+        entries = self.namespaces.get(namespace)
+        if not entries or key not in entries:
+            return False, None
+        value, expires_at = entries[key]
+        if time.monotonic() >= expires_at:
+            del entries[key]
+            return False, None
+        entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: str, namespace: str, value: Any, ttl: float, max_entries: int):
+        if max_entries <= 0 or ttl <= 0:
+            return
+        entries = self.namespaces.setdefault(namespace, OrderedDict())
+        entries[key] = (value, time.monotonic() + ttl)
+        entries.move_to_end(key)
+        while len(entries) > max_entries:
+            entries.popitem(last=False)
+
+    def delete(self, key: str, namespace: str):
+        entries = self.namespaces.get(namespace)
+        if entries:
+            entries.pop(key, None)
+
+    def clear(self, namespace: Optional[str] = None):
+        if namespace is None:
+            self.namespaces.clear()
+        else:
+            self.namespaces.pop(namespace, None)
+
+
+def chunked(items: List[Any], size: int = BATCH_CHUNK_SIZE) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class CachePipeline:
+    """Queues encoded writes on a Redis pipeline; L1 and other nodes are updated once it executes."""
+
+    def __init__(self, redis_config: "RedisConfig", pipe):
+        self.redis_config = redis_config
+        self.raw = pipe
+        self.commands = []
+        self.written = {}
+        self.deleted = []
+
+    def set(self, key: str, value: Any, expire: int = 3600):
+        config = self.redis_config.namespace_config(key_namespace(key))
+        data = codecs.encode(value, config.codec, config.compression, config.compression_threshold)
+        self.commands.append((key, data, expire))
+        self.written[key] = (value, expire)
+        return self
+
+    def delete(self, key: str):
+        self.commands.append((key, None, None))
+        self.deleted.append(key)
+        self.written.pop(key, None)
+        return self
+
+    async def execute(self):
+        for key, data, expire in self.commands:
+            if data is None:
+                self.raw.delete(key)
+            else:
+                self.raw.set(key, data, ex=expire)
+        # Publish after the writes, as RedisConfig.set does, so no node can reload the old value once it drops its L1 copy.
+        keys = list(self.written) + self.deleted
+        if keys:
+            self.raw.publish(INVALIDATION_CHANNEL, json.dumps({"node": self.redis_config.node_id, "keys": keys}))
+        results = await self.raw.execute()
+        for key in self.deleted:
+            self.redis_config.local.delete(key, key_namespace(key))
+        for key, (value, expire) in self.written.items():
+            self.redis_config.remember(key, value, expire)
+        self.commands, self.written, self.deleted = [], {}, []
+        return results
+
 
 class RedisConfig:
     _instance = None
@@ -15,7 +152,14 @@ class RedisConfig:
         if not hasattr(self, 'initialized'):
             self.REDIS_URL = ""
             self.client = None
+            self.binary_client = None
             self.initialized = False
+            self.namespace_versions = {}
+            self.namespace_configs = {}
+            self.local = LocalCache()
+            self.node_id = secrets.token_hex(8)
+            self.invalidation_task = None
+            self.last_error_logged = 0.0
 
     async def initialize(self):
         if not self.initialized:
@@ -25,44 +169,357 @@ class RedisConfig:
                     encoding="utf-8",
                     decode_responses=True
                 )
+                self.binary_client = Redis.from_url(
+                    self.REDIS_URL,
+                    decode_responses=False
+                )
                 await self.client.ping()
+                self.invalidation_task = asyncio.create_task(self._listen_invalidations())
                 self.initialized = True
             except Exception as e:
                 raise Exception(f"Failed to initialize Redis: {str(e)}")
         return self
 
     async def close(self):
+        if self.invalidation_task:
+            self.invalidation_task.cancel()
         if self.client:
             await self.client.close()
+        if self.binary_client:
+            await self.binary_client.close()
+
+    def configure_namespace(self, namespace: str, **options):
+        config = self.namespace_config(namespace)
+        for name, value in options.items():
+            setattr(config, name, value)
+        self.namespace_configs[namespace] = config
+
+    def namespace_config(self, namespace: str) -> NamespaceConfig:
+        return self.namespace_configs.get(namespace) or NamespaceConfig()
+
+    def remember(self, key: str, value: Any, expire: Optional[float] = None):
+        namespace = key_namespace(key)
+        config = self.namespace_config(namespace)
+        ttl = config.l1_ttl if expire is None else min(config.l1_ttl, expire)
+        self.local.set(key, namespace, value, ttl, config.l1_max_entries)
+
+    def report_error(self, namespace: str, operation: str, error: Exception):
+        cache_stats.record(namespace, "error")
+        now = time.monotonic()
+        if now - self.last_error_logged >= ERROR_LOG_INTERVAL:
+            self.last_error_logged = now
+            logger.warning(f"Redis cache {operation} failed for namespace {namespace}: {str(error)}")
 
     async def get(self, key: str) -> Optional[Any]:
+        namespace = key_namespace(key)
+        cache_stats.sample_key(key)
+        hit, value = self.local.get(key, namespace)
+        if hit:
+            cache_stats.record(namespace, "l1_hit")
+            return value
+        started = time.perf_counter()
         try:
-            data = await self.client.get(key)
-            return json.loads(data) if data else None
-        except Exception:
+            data = await self.binary_client.get(key)
+            value = codecs.decode(data) if data else None
+        except Exception as e:
+            self.report_error(namespace, "get", e)
             return None
+        latency = time.perf_counter() - started
+        if value is None:
+            cache_stats.record(namespace, "miss", latency=latency)
+            return None
+        cache_stats.record(namespace, "hit", latency=latency, size=len(data))
+        self.remember(key, value)
+        return value
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        results = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            namespace = key_namespace(key)
+            cache_stats.sample_key(key)
+            hit, value = self.local.get(key, namespace)
+            if hit:
+                cache_stats.record(namespace, "l1_hit")
+                results[key] = value
+            else:
+                missing.append(key)
+        if not missing:
+            return results
+
+        started = time.perf_counter()
+        try:
+            pipe = self.binary_client.pipeline(transaction=False)
+            chunks = list(chunked(missing))
+            for chunk in chunks:
+                pipe.mget(chunk)
+            responses = await pipe.execute()
+        except Exception as e:
+            self.report_error(key_namespace(missing[0]), "get_many", e)
+            return results
+        cache_stats.record(key_namespace(missing[0]), "get_many", latency=time.perf_counter() - started)
+
+        for chunk, datas in zip(chunks, responses):
+            for key, data in zip(chunk, datas):
+                namespace = key_namespace(key)
+                if not data:
+                    cache_stats.record(namespace, "miss")
+                    continue
+                try:
+                    value = codecs.decode(data)
+                except Exception as e:
+                    self.report_error(namespace, "decode", e)
+                    continue
+                cache_stats.record(namespace, "hit", size=len(data))
+                results[key] = value
+                self.remember(key, value)
+        return results
+
+    async def set_many(self, items: Dict[str, Any], expire: int = 3600):
+        for chunk in chunked(list(items)):
+            try:
+                async with self.pipeline(transaction=False) as pipe:
+                    for key in chunk:
+                        pipe.set(key, items[key], expire)
+            except Exception:
+                for key in chunk:
+                    self.local.delete(key, key_namespace(key))
+
+    async def delete_many(self, keys: List[str]):
+        for chunk in chunked(list(dict.fromkeys(keys))):
+            try:
+                async with self.pipeline(transaction=False) as pipe:
+                    for key in chunk:
+                        pipe.delete(key)
+            except Exception:
+                for key in chunk:
+                    self.local.delete(key, key_namespace(key))
+
+    @asynccontextmanager
+    async def pipeline(self, transaction: bool = True):
+        pipe = CachePipeline(self, self.binary_client.pipeline(transaction=transaction))
+        yield pipe
+        await pipe.execute()
 
     async def set(self, key: str, value: Any, expire: int = 3600):
+        namespace = key_namespace(key)
+        config = self.namespace_config(namespace)
+        started = time.perf_counter()
+        try:
+            data = codecs.encode(value, config.codec, config.compression, config.compression_threshold)
+            pipe = self.binary_client.pipeline(transaction=False)
+            pipe.set(key, data, ex=expire)
+            pipe.publish(INVALIDATION_CHANNEL, json.dumps({"node": self.node_id, "keys": [key]}))
+            await pipe.execute()
+        except Exception as e:
+            self.report_error(namespace, "set", e)
+            self.local.delete(key, namespace)
+            return
+        cache_stats.record(namespace, "set", latency=time.perf_counter() - started, size=len(data))
+        self.remember(key, value, expire)
+
+    async def delete(self, key: str):
+        self.local.delete(key, key_namespace(key))
+        try:
+            pipe = self.binary_client.pipeline(transaction=False)
+            pipe.delete(key)
+            pipe.publish(INVALIDATION_CHANNEL, json.dumps({"node": self.node_id, "keys": [key]}))
+            await pipe.execute()
+        except Exception as e:
+            self.report_error(key_namespace(key), "delete", e)
+
+    async def _listen_invalidations(self):
+        while True:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Anything cached while we were not subscribed may have been missed.
+                self.local.clear()
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    event = json.loads(message["data"])
+                    if event.get("node") == self.node_id:
+                        continue
+                    for key in event.get("keys", []):
+                        self.local.delete(key, key_namespace(key))
+                    if event.get("namespace"):
+                        self.local.clear(event["namespace"])
+                        self.namespace_versions.pop(event["namespace"], None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.report_error("default", "invalidation listener", e)
+                self.local.clear()
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    async def namespace_version(self, namespace: str) -> int:
+        cached_version = self.namespace_versions.get(namespace)
+        if cached_version and time.monotonic() - cached_version[1] < NAMESPACE_VERSION_TTL:
+            return cached_version[0]
+        try:
+            version = int(await self.client.get(f"{CACHE_KEY_PREFIX}:ns:{namespace}") or 0)
+        except Exception:
+            return cached_version[0] if cached_version else 0
+        self.namespace_versions[namespace] = (version, time.monotonic())
+        return version
+
+    async def acquire_lock(self, key: str, timeout: float) -> Optional[str]:
+        token = secrets.token_hex(8)
+        try:
+            if await self.client.set(f"lock:{key}", token, nx=True, px=int(timeout * 1000)):
+                return token
+        except Exception:
+            return token
+        return None
+
+    async def release_lock(self, key: str, token: str):
         try:
-            await self.client.set(key, json.dumps(value), ex=expire)
+            await self.client.eval(RELEASE_LOCK_SCRIPT, 1, f"lock:{key}", token)
         except Exception:
             pass
 
+    async def invalidate_namespace(self, namespace: str) -> int:
+        version = await self.client.incr(f"{CACHE_KEY_PREFIX}:ns:{namespace}")
+        self.namespace_versions[namespace] = (version, time.monotonic())
+        self.local.clear(namespace)
+        await self.client.publish(INVALIDATION_CHANNEL, json.dumps({"node": self.node_id, "namespace": namespace}))
+        return version
+
 redis_config = RedisConfig()
 
-def get_cached_info(redis):
-    return 0
+async def get_cached_info(redis: RedisConfig) -> dict:
+    try:
+        redis_up = bool(redis.client and await redis.client.ping())
+    except Exception:
+        redis_up = False
+    return {"redis_up": redis_up, **cache_stats.snapshot()}
+
+def canonicalize(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Enum):
+        return canonicalize(value.value)
+    if isinstance(value, (datetime, date)):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, bytes):
+        return {"__bytes__": value.hex()}
+    if isinstance(value, BaseModel):
+        return canonicalize(value.model_dump())
+    if isinstance(value, dict):
+        return {"__dict__": sorted([str(k), canonicalize(v)] for k, v in value.items())}
+    if isinstance(value, (list, tuple)):
+        return [canonicalize(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return {"__set__": sorted((canonicalize(v) for v in value), key=json.dumps)}
+    value_type = type(value)
+    identity = {"__type__": f"{value_type.__module__}.{value_type.__qualname__}"}
+    if value_type.__repr__ is not object.__repr__:
+        identity["repr"] = repr(value)
+    return identity
+
 
-def cached(expire: int = 3600):
+def build_cache_key(namespace: str, signature: inspect.Signature, args: tuple, kwargs: dict,
+                    version: int = 1, generation: int = 0) -> str:
+    bound = signature.bind_partial(*args, **kwargs)
+    bound.apply_defaults()
+    arguments = {
+        name: canonicalize(value)
+        for name, value in sorted(bound.arguments.items())
+        if not isinstance(value, IGNORED_KEY_TYPES)
+    }
+    payload = json.dumps(arguments, sort_keys=True, separators=(",", ":"))
+    digest = hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+    return f"{CACHE_KEY_PREFIX}:{namespace}:{version}.{generation}:{digest}"
+
+
+class SingleFlight:
+    """Runs at most one computation per key in this process, and asks Redis to hold the others off."""
+
+    def __init__(self):
+        self.inflight = {}
+
+    def run(self, key: str, compute, lock_timeout: float) -> asyncio.Future:
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run(key, compute, lock_timeout))
+            self.inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return task
+
+    def _finish(self, key: str, task: asyncio.Future):
+        self.inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()
+
+    async def _run(self, key: str, compute, lock_timeout: float):
+        token = await redis_config.acquire_lock(key, lock_timeout)
+        if token is None:
+            deadline = time.monotonic() + lock_timeout
+            while time.monotonic() < deadline:
+                await asyncio.sleep(LOCK_POLL_INTERVAL)
+                entry = await redis_config.get(key)
+                if is_fresh(entry):
+                    return entry["value"]
+        try:
+            return await compute()
+        finally:
+            if token is not None:
+                await redis_config.release_lock(key, token)
+
+
+single_flight = SingleFlight()
+
+
+def is_fresh(entry: Any) -> bool:
+    return isinstance(entry, dict) and "expires_at" in entry and time.time() < entry["expires_at"]
+
+
+def should_refresh_early(entry: dict, beta: float) -> bool:
+    # XFetch: the closer to expiry and the slower the recompute, the likelier an early refresh.
+    if beta <= 0:
+        return False
+    return time.time() - entry["delta"] * beta * math.log(1 - random.random()) >= entry["expires_at"]
+
+
+def cached(expire: int = 3600, namespace: Optional[str] = None, version: int = 1,
+           stale_ttl: int = 0, early_expiration_beta: float = 1.0, lock_timeout: float = 10):
     def decorator(func):
+        func_namespace = namespace or f"{func.__module__}.{func.__qualname__}"
+        signature = inspect.signature(func)
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            key = f"{func.__name__}:{str(args)}:{str(kwargs)}"
-            cached_result = await redis_config.get(key)
-            if cached_result is not None:
-                return cached_result
-            result = await func(*args, **kwargs)
-            await redis_config.set(key, result, expire)
-            return result
+            generation = await redis_config.namespace_version(func_namespace)
+            key = build_cache_key(func_namespace, signature, args, kwargs, version, generation)
+
+            async def compute():
+                started = time.time()
+                result = await func(*args, **kwargs)
+                finished = time.time()
+                cache_stats.record(func_namespace, "computed", compute_time=finished - started)
+                entry = {
+                    "value": result,
+                    "computed_at": finished,
+                    "delta": finished - started,
+                    "expires_at": finished + expire,
+                }
+                await redis_config.set(key, entry, expire + stale_ttl)
+                return result
+
+            entry = await redis_config.get(key)
+            if is_fresh(entry):
+                if should_refresh_early(entry, early_expiration_beta):
+                    cache_stats.record(func_namespace, "early_refresh")
+                    single_flight.run(key, compute, lock_timeout)
+                return entry["value"]
+            if stale_ttl and isinstance(entry, dict) and "expires_at" in entry:
+                cache_stats.record(func_namespace, "stale_served")
+                single_flight.run(key, compute, lock_timeout)
+                return entry["value"]
+            return await asyncio.shield(single_flight.run(key, compute, lock_timeout))
+        wrapper.cache_namespace = func_namespace
         return wrapper
     return decorator
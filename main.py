@@ -12,10 +12,19 @@ import secrets
 
 from database.database import init_web3_and_db, get_web3_config
 from database.redis import redis_config
-from database.redis import cached
+from database.redis import cached, get_cached_info
 from utility.logger import logger
 from utility.webhookManager import send_startup_webhook
+from utility.logshipper import stop_log_shippers
+from utility.cpuexecutor import cpu_executor
+from core.walletpool import wallet_pool
+from core.tokengeneration import tokens_generation
+from api.main import close_solana_manager, get_solana_manager
 from api.discovery.discovery import router as discovery_router
+from middleware.requestlog import RequestLogMiddleware
+from middleware.ratelimit import RateLimitMiddleware
+from middleware.metrics import MetricsMiddleware, mark_process_dead, metrics_response
+from middleware.session import session_touches
 
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID", "GOOGLE_CLIENT_ID")
 GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET", "GOOGLE_CLIENT_SECRET")
@@ -37,6 +46,8 @@ async def lifespan(app: FastAPI):
 
         await redis_config.initialize()
         logger.info("Redis cache initialized successfully")
+        wallet_pool.start()
+        get_solana_manager()
 
         app.state.db = db
 
@@ -77,11 +88,22 @@ async def lifespan(app: FastAPI):
         raise
     finally:
         logger.info("Shutting down the application...")
+        await session_touches.stop()
+        await tokens_generation.stop()
+        await wallet_pool.stop()
+        await close_solana_manager()
+        cpu_executor.shutdown()
+        await stop_log_shippers()
+        mark_process_dead()
 
 
 
 app = FastAPI(lifespan=lifespan)
 
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(RequestLogMiddleware)
+app.add_middleware(MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -110,6 +132,16 @@ async def health_check():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return metrics_response()
+
+
+@app.get("/metrics/cache", tags=["healthcheck"])
+async def cache_metrics():
+    return await get_cached_info(redis_config)
+
+
 def main():
     import asyncio
     from hypercorn.asyncio import serve
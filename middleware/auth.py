@@ -1,12 +1,85 @@
+import hashlib
+import time
+from typing import Optional
+
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from bson import ObjectId
 from database.database import db
 from database.models import User
+from database.redis import CACHE_KEY_PREFIX, redis_config
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+PRINCIPAL_NAMESPACE = "principal"
+USER_VERSION_KEY = "user:version:{}"
+USER_VERSION_CACHE_TTL = 300
+# Only the fields the User model exposes are loaded; the password hash never leaves Mongo.
+USER_PROJECTION = {field.alias or name: 1 for name, field in User.model_fields.items()}
+
+redis_config.configure_namespace(PRINCIPAL_NAMESPACE, l1_max_entries=10000, l1_ttl=30)
+
+
+def principal_cache_key(token: str) -> str:
+    digest = hashlib.sha256(token.encode()).hexdigest()
+    return f"{CACHE_KEY_PREFIX}:{PRINCIPAL_NAMESPACE}:token:{digest}"
+
+
+def user_version_cache_key(user_id: str) -> str:
+    return f"{CACHE_KEY_PREFIX}:{PRINCIPAL_NAMESPACE}:version:{user_id}"
+
+
+async def get_user_version(user_id: str) -> int:
+    key = user_version_cache_key(user_id)
+    version = await redis_config.get(key)
+    if version is not None:
+        return version
+    try:
+        version = int(await redis_config.client.get(USER_VERSION_KEY.format(user_id)) or 0)
+    except Exception:
+        return 0
+    await redis_config.set(key, version, expire=USER_VERSION_CACHE_TTL)
+    return version
+
+
+async def bump_user_version(user_id: str):
+    """Invalidate every cached principal for a user; call after changing roles, is_active or profile fields."""
+    try:
+        await redis_config.client.incr(USER_VERSION_KEY.format(user_id))
+    except Exception:
+        pass
+    await redis_config.delete(user_version_cache_key(str(user_id)))
+
+
+async def load_principal(token: str, payload: dict, query: dict, user_id: Optional[str] = None) -> Optional[User]:
+    key = principal_cache_key(token)
+    cached = await redis_config.get(key)
+    if cached and cached["version"] == await get_user_version(cached["user"]["_id"]):
+        return User(**cached["user"])
+
+    if user_id is None:
+        # Tokens keyed by username: learn the id first so the version below is read before the load.
+        found = await db.users.find_one(query, {"_id": 1})
+        if found is None:
+            return None
+        user_id = str(found["_id"])
+        query = {"_id": found["_id"]}
+
+    # A bump landing after this read makes the entry stale on its next check instead of pinning old data.
+    version = await get_user_version(user_id)
+    user = await db.users.find_one(query, USER_PROJECTION)
+    if user is None:
+        return None
+    user["_id"] = str(user["_id"])
+
+    # Entries live no longer than the token itself.
+    ttl = int(payload.get("exp", 0) - time.time())
+    if ttl > 0:
+        await redis_config.set(key, {"user": user, "version": version}, expire=ttl)
+    return User(**user)
+
+
 async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -22,11 +95,11 @@ async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)
         if user_id is None:
             raise credentials_exception
 
-        user = await db.users.find_one({"_id": ObjectId(user_id)})
+        user = await load_principal(token, payload, {"_id": ObjectId(user_id)}, user_id)
         if user is None:
             raise credentials_exception
 
-        return User(**user)
+        return user
 
     except JWTError:
         raise credentials_exception
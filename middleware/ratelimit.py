@@ -0,0 +1,162 @@
+import hashlib
+import json
+import math
+import time
+from typing import Optional, Tuple
+
+from database.redis import redis_config
+from middleware.auth import principal_cache_key
+from middleware.session import session_cache_key
+from utility.logger import logger
+
+# (path prefix, group, requests, period seconds); the first matching prefix wins.
+RATE_LIMIT_GROUPS = [
+    ("/api/wallet/swap", "swap", 10, 60),
+    ("/api/wallet/send_token", "send", 10, 60),
+    ("/api/wallet/transfer", "send", 10, 60),
+    ("/api/wallet/transactions", "transactions", 30, 60),
+    ("/api/wallet", "wallet", 120, 60),
+    ("/api/discovery", "discovery", 120, 60),
+    ("/api/auth", "auth", 30, 60),
+    ("/api", "api", 300, 60),
+]
+LOCAL_MAX_KEYS = 100000
+WARNING_INTERVAL = 60
+
+# GCRA: one key per client and group holding the theoretical arrival time in ms.
+GCRA_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local emission = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+local new_tat = tat + emission
+local allow_at = new_tat - tolerance
+if now < allow_at then
+    return {0, 0, allow_at - now, tat - now}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+return {1, math.floor((tolerance - (new_tat - now)) / emission), 0, new_tat - now}
+"""
+
+
+def match_group(path: str) -> Optional[Tuple[str, int, int]]:
+    for prefix, group, limit, period in RATE_LIMIT_GROUPS:
+        if path == prefix or path.startswith(prefix + "/"):
+            return group, limit, period
+    return None
+
+
+def client_ip(scope) -> str:
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+def bearer_token(scope) -> Optional[str]:
+    for name, value in scope.get("headers", []):
+        if name == b"authorization" and value.lower().startswith(b"bearer "):
+            return value[7:].decode("latin-1")
+    return None
+
+
+async def verified_session(token: str) -> Optional[str]:
+    # Only tokens the auth layer has already resolved and cached earn their own bucket;
+    # an unchecked header would let a client mint a fresh limit per request.
+    for key in (session_cache_key(token), principal_cache_key(token)):
+        if await redis_config.get(key) is not None:
+            return "session:" + hashlib.sha256(token.encode()).hexdigest()[:32]
+    return None
+
+
+class LocalGCRA:
+    """In-process fallback used while Redis is unavailable; limits are then per process."""
+
+    def __init__(self):
+        self.tats = {}
+
+    def check(self, key: str, emission: float, tolerance: float):
+        now = time.monotonic() * 1000
+        if len(self.tats) > LOCAL_MAX_KEYS:
+            self.tats = {k: v for k, v in self.tats.items() if v > now}
+        tat = max(self.tats.get(key, now), now)
+        new_tat = tat + emission
+        allow_at = new_tat - tolerance
+        if now < allow_at:
+            return 0, 0, allow_at - now, tat - now
+        self.tats[key] = new_tat
+        return 1, math.floor((tolerance - (new_tat - now)) / emission), 0, new_tat - now
+
+
+class RateLimitMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self.script = None
+        self.local = LocalGCRA()
+        self.last_warning = 0.0
+
+    async def check(self, key: str, limit: int, period: int):
+        emission = period * 1000 / limit
+        tolerance = period * 1000
+        if redis_config.initialized:
+            try:
+                if self.script is None:
+                    self.script = redis_config.client.register_script(GCRA_SCRIPT)
+                return await self.script(keys=[key], args=[emission, tolerance])
+            except Exception as e:
+                if time.monotonic() - self.last_warning >= WARNING_INTERVAL:
+                    self.last_warning = time.monotonic()
+                    logger.warning(f"Rate limiter falling back to local counters: {str(e)}")
+        return self.local.check(key, emission, tolerance)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        matched = match_group(scope["path"])
+        if matched is None:
+            await self.app(scope, receive, send)
+            return
+
+        group, limit, period = matched
+        # The per-IP bucket always applies; a verified session adds its own bucket on top.
+        allowed, remaining, retry_after_ms, reset_ms = await self.check(
+            f"ratelimit:{group}:{client_ip(scope)}", limit, period
+        )
+        token = bearer_token(scope)
+        if allowed and token:
+            session = await verified_session(token)
+            if session:
+                session_result = await self.check(f"ratelimit:{group}:{session}", limit, period)
+                if not session_result[0] or session_result[1] < remaining:
+                    allowed, remaining, retry_after_ms, reset_ms = session_result
+
+        headers = [
+            (b"ratelimit-limit", str(limit).encode()),
+            (b"ratelimit-remaining", str(max(0, int(remaining))).encode()),
+            (b"ratelimit-reset", str(math.ceil(reset_ms / 1000)).encode()),
+            (b"ratelimit-policy", f"{limit};w={period}".encode()),
+        ]
+
+        if not allowed:
+            body = json.dumps({"detail": "Rate limit exceeded"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": headers + [
+                    (b"retry-after", str(math.ceil(retry_after_ms / 1000)).encode()),
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
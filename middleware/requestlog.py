@@ -0,0 +1,56 @@
+import logging
+import time
+
+from utility.logshipper import log_shippers
+
+logger = logging.getLogger("app_logger")
+
+
+class RequestLogMiddleware:
+    """Logs every request and error response per method without wrapping the response body."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        path = scope["path"]
+        client_ip = scope["client"][0] if scope.get("client") else None
+        shipper = log_shippers.get(method)
+
+        log_message = f"{method} request to {path} from IP: {client_ip}"
+        logger.info(log_message)
+        if shipper:
+            shipper.submit(log_message)
+
+        # Stays None when the client disconnects before a response starts; that is not a server error.
+        status_code = None
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception as e:
+            logger.error(f"Unhandled {type(e).__name__} on {method} request to {path}: {str(e)}")
+            if status_code is None:
+                status_code = 500
+            raise
+        finally:
+            if status_code is not None and status_code >= 400:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                error_message = (
+                    f"Error {status_code} on {method} request to {path} "
+                    f"from IP: {client_ip} ({elapsed_ms:.1f} ms)"
+                )
+                logger.error(error_message)
+                if shipper:
+                    shipper.submit(error_message)
@@ -0,0 +1,156 @@
+import asyncio
+import hashlib
+import os
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Dict, Optional
+
+from bson import ObjectId
+from fastapi import Depends, HTTPException, Request, status
+from pymongo import UpdateOne
+
+from database.database import Database, db, get_database
+from database.redis import CACHE_KEY_PREFIX, redis_config
+from utility.logger import logger
+
+SESSION_NAMESPACE = "session"
+SESSION_CACHE_TTL = 300
+SESSION_TOUCH_MAX_STALENESS = float(os.getenv("SESSION_TOUCH_MAX_STALENESS", "30"))
+
+redis_config.configure_namespace(SESSION_NAMESPACE, l1_max_entries=10000, l1_ttl=60)
+
+
+@dataclass
+class SessionPrincipal:
+    user_id: str
+    username: Optional[str]
+    twitter_username: Optional[str]
+    full_name: Optional[str]
+    profile_image: Optional[str]
+    email: Optional[str]
+    expires_at: float
+
+
+def bearer_token(request: Request) -> Optional[str]:
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return None
+    return auth_header.split(' ')[1]
+
+
+def session_cache_key(session_token: str) -> str:
+    # Only a digest of the token is stored so the cache never holds usable credentials.
+    digest = hashlib.sha256(session_token.encode()).hexdigest()
+    return f"{CACHE_KEY_PREFIX}:{SESSION_NAMESPACE}:v1:{digest}"
+
+
+async def resolve_session(session_token: str, db: Database) -> Optional[SessionPrincipal]:
+    """Return the principal for a live session token, or None; never raises for bad tokens."""
+    key = session_cache_key(session_token)
+    cached = await redis_config.get(key)
+    if cached and cached["expires_at"] > time.time():
+        return SessionPrincipal(**cached)
+
+    session = await db.sessions.find_one(
+        {"session_token": session_token, "expires_at": {"$gt": datetime.utcnow()}},
+        {"user_id": 1, "expires_at": 1}
+    )
+    if not session:
+        return None
+    user = await db.users.find_one(
+        {"_id": ObjectId(session["user_id"])},
+        {"username": 1, "twitter_username": 1, "full_name": 1, "twitter_profile_image": 1, "email": 1}
+    )
+    if not user:
+        return None
+
+    # Session expiry is stored as naive UTC.
+    expires_at = (session["expires_at"] - datetime(1970, 1, 1)).total_seconds()
+    principal = SessionPrincipal(
+        user_id=str(user["_id"]),
+        username=user.get("twitter_username", user.get("username")),
+        twitter_username=user.get("twitter_username"),
+        full_name=user.get("full_name"),
+        profile_image=user.get("twitter_profile_image"),
+        email=user.get("email"),
+        expires_at=expires_at,
+    )
+    ttl = min(SESSION_CACHE_TTL, int(expires_at - time.time()))
+    if ttl > 0:
+        await redis_config.set(key, asdict(principal), expire=ttl)
+    return principal
+
+
+async def get_session_principal(
+    request: Request,
+    db: Database = Depends(get_database)
+) -> SessionPrincipal:
+    session_token = bearer_token(request)
+    if not session_token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authorization header"
+        )
+    principal = await resolve_session(session_token, db)
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired session"
+        )
+    return principal
+
+
+async def evict_session(session_token: str):
+    await redis_config.delete(session_cache_key(session_token))
+
+
+class SessionTouchBuffer:
+    """Coalesces last_accessed updates per session and writes them in one bulk_write per interval."""
+
+    def __init__(self, max_staleness: float = SESSION_TOUCH_MAX_STALENESS):
+        self.max_staleness = max_staleness
+        self.pending: Dict[str, datetime] = {}
+        self.task = None
+
+    def touch(self, session_token: str):
+        self.pending[session_token] = datetime.utcnow()
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def flush(self):
+        if not self.pending:
+            return
+        touches, self.pending = self.pending, {}
+        operations = [
+            UpdateOne({"session_token": token}, {"$set": {"last_accessed": accessed}})
+            for token, accessed in touches.items()
+        ]
+        try:
+            await db.sessions.bulk_write(operations, ordered=False)
+        except asyncio.CancelledError:
+            # Cancelled mid-write by stop(); the final flush retries these.
+            self.pending = {**touches, **self.pending}
+            raise
+        except Exception as e:
+            logger.error(f"Error flushing session touches: {str(e)}")
+            # Keep touches that arrived during the failed write; they are newer.
+            self.pending = {**touches, **self.pending}
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.max_staleness)
+            await self.flush()
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        await self.flush()
+
+
+session_touches = SessionTouchBuffer()
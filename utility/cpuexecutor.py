@@ -0,0 +1,80 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException, status
+from prometheus_client import Counter, Gauge, Histogram
+
+from utility.cputasks import run_task
+
+CPU_EXECUTOR_WORKERS = int(os.getenv("CPU_EXECUTOR_WORKERS", str(os.cpu_count() or 2)))
+CPU_EXECUTOR_MAX_QUEUE = int(os.getenv("CPU_EXECUTOR_MAX_QUEUE", str(CPU_EXECUTOR_WORKERS * 8)))
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+QUEUE_DEPTH = Gauge(
+    "cpu_executor_queue_depth", "CPU tasks queued or running", multiprocess_mode="livesum"
+)
+WAIT_TIME = Histogram(
+    "cpu_executor_wait_seconds", "Time a CPU task waited for a worker", ["task"], buckets=WAIT_BUCKETS
+)
+RUN_TIME = Histogram(
+    "cpu_executor_run_seconds", "Time a CPU task spent in a worker", ["task"], buckets=WAIT_BUCKETS
+)
+REJECTED = Counter(
+    "cpu_executor_rejected_total", "CPU tasks rejected because the queue was full", ["task"]
+)
+
+
+class CPUExecutor:
+    """Process pool for bcrypt, PBKDF2 and key derivation, with a bounded admission queue."""
+
+    def __init__(self, max_workers: int = CPU_EXECUTOR_WORKERS, max_queue: int = CPU_EXECUTOR_MAX_QUEUE):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.pool = None
+        self.pending = 0
+
+    def start(self):
+        if self.pool is None:
+            # spawn: forking a process that already runs an event loop and driver threads is unsafe.
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self.pool
+
+    def has_capacity(self, count: int = 1) -> bool:
+        return self.pending + count <= self.max_queue
+
+    async def run(self, fn, *args):
+        task = fn.__name__
+        if not self.has_capacity():
+            REJECTED.labels(task).inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+        pool = self.start()
+        self.pending += 1
+        QUEUE_DEPTH.inc()
+        submitted_at = time.time()
+        try:
+            started_at, result = await asyncio.get_running_loop().run_in_executor(pool, run_task, fn, args)
+        finally:
+            self.pending -= 1
+            QUEUE_DEPTH.dec()
+        WAIT_TIME.labels(task).observe(max(0.0, started_at - submitted_at))
+        RUN_TIME.labels(task).observe(max(0.0, time.time() - started_at))
+        return result
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            self.pool = None
+
+
+cpu_executor = CPUExecutor()
@@ -0,0 +1,55 @@
+"""CPU-bound work run inside cpu_executor worker processes; everything here must be picklable."""
+import hashlib
+import time
+
+from base58 import b58encode  # type: ignore
+from mnemonic import Mnemonic  # type: ignore
+from passlib.context import CryptContext
+from solders.keypair import Keypair  # type: ignore
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+mnemo = Mnemonic("english")
+
+
+def run_task(fn, args):
+    # Report when the worker picked the task up so the parent can measure queue wait.
+    return time.time(), fn(*args)
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    try:
+        return pwd_context.verify(plain_password, hashed_password)
+    except Exception:
+        return False
+
+
+def derive_wallet(mnemonic_phrase: str) -> dict:
+    seed = mnemo.to_seed(mnemonic_phrase)
+    keypair = Keypair.from_seed(hashlib.sha256(seed).digest()[:32])
+    return {
+        "public_key": str(keypair.pubkey()),
+        "private_key": b58encode(bytes(keypair)).decode('ascii'),
+    }
+
+
+def generate_wallet() -> dict:
+    mnemonic_phrase = mnemo.generate(strength=128)
+    return {"mnemonic_phrase": mnemonic_phrase, **derive_wallet(mnemonic_phrase)}
+
+
+def generate_wallets(count: int) -> list:
+    return [generate_wallet() for _ in range(count)]
+
+
+def derive_wallets(mnemonic_phrases: list) -> list:
+    wallets = []
+    for mnemonic_phrase in mnemonic_phrases:
+        try:
+            wallets.append(derive_wallet(mnemonic_phrase))
+        except Exception:
+            wallets.append(None)
+    return wallets
@@ -4,6 +4,9 @@ from dataclasses import dataclass
 class Config:
     LAMPORTS_PER_SOL: int = 1000000000
     RPC_URL: str = 'https://solana-mainnet.api.syndica.io/api-key/'
+    RPC_TIMEOUT: float = 30
+    RPC_COMMITMENT: str = "confirmed"
+    CONFIRMATION_WEBHOOK_URL: str = ""  # operator-configured; notified when tracked transactions resolve
     DEFAULT_SLIPPAGE: int = 5
     DEFAULT_PRIORITY_FEE: float = 0.0005
     COMPUTE_PRICE: int = 400000
@@ -0,0 +1,127 @@
+import asyncio
+import random
+from collections import deque
+
+import httpx
+
+from utility.logger import logger
+from utility.webhooks import Webhooks
+
+MAX_QUEUE = 10000
+SAMPLE_ABOVE = 0.75
+SAMPLE_RATE = 0.1
+FLUSH_INTERVAL = 2.0
+MAX_MESSAGE_LENGTH = 2000
+MAX_SEND_ATTEMPTS = 5
+# Shutdown waits at most this long for queued lines; retries and 429 backoff could otherwise hold exit for minutes.
+STOP_FLUSH_TIMEOUT = 5.0
+
+
+class LogShipper:
+    """Ships log lines to a Discord webhook from a bounded queue, many lines per message."""
+
+    def __init__(self, webhook_url: str, max_queue: int = MAX_QUEUE):
+        self.webhook_url = webhook_url
+        self.max_queue = max_queue
+        self.lines = deque()
+        self.ready = None
+        self.task = None
+        self.client = None
+        self.dropped = 0
+        self.sent = 0
+
+    def submit(self, message: str):
+        if not self.webhook_url:
+            return
+        self.start()
+        depth = len(self.lines) / self.max_queue
+        if depth >= 1 or (depth >= SAMPLE_ABOVE and random.random() >= SAMPLE_RATE):
+            self.dropped += 1
+            return
+        self.lines.append(message)
+        self.ready.set()
+
+    def start(self):
+        if self.task is None:
+            self.ready = asyncio.Event()
+            self.client = httpx.AsyncClient(timeout=10)
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is None:
+            return
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+        self.task = None
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + STOP_FLUSH_TIMEOUT
+        while self.lines:
+            unsent = self.dropped + len(self.lines)
+            try:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                await asyncio.wait_for(self._send(self._take_batch()), remaining)
+            except asyncio.TimeoutError:
+                logger.warning(f"Dropped {unsent} log lines not shipped within {STOP_FLUSH_TIMEOUT}s of shutdown")
+                self.lines.clear()
+                break
+        await self.client.aclose()
+
+    def _take_batch(self) -> list:
+        lines = []
+        length = 0
+        if self.dropped:
+            lines.append(f"({self.dropped} log lines dropped under load)")
+            length = len(lines[0])
+            self.dropped = 0
+        while self.lines:
+            line = self.lines[0][:MAX_MESSAGE_LENGTH - 1]
+            if lines and length + len(line) + 1 > MAX_MESSAGE_LENGTH:
+                break
+            self.lines.popleft()
+            lines.append(line)
+            length += len(line) + 1
+        return lines
+
+    async def _run(self):
+        while True:
+            await self.ready.wait()
+            # Let lines accumulate so one webhook call carries many of them.
+            await asyncio.sleep(FLUSH_INTERVAL)
+            self.ready.clear()
+            while self.lines:
+                await self._send(self._take_batch())
+
+    async def _send(self, lines: list):
+        if not lines:
+            return
+        content = "\n".join(lines)
+        for _ in range(MAX_SEND_ATTEMPTS):
+            try:
+                response = await self.client.post(self.webhook_url, json={"content": content})
+                if response.status_code == 429:
+                    retry_after = float(response.json().get("retry_after", response.headers.get("Retry-After", 1)))
+                    await asyncio.sleep(retry_after)
+                    continue
+                response.raise_for_status()
+                self.sent += len(lines)
+                return
+            except httpx.HTTPStatusError as e:
+                logger.error(f"Failed to send log webhook: {e.response.text}")
+                return
+            except Exception as e:
+                logger.error(f"An error occurred while sending log webhook: {str(e)}")
+                await asyncio.sleep(1)
+        self.dropped += len(lines)
+
+
+log_shippers = {
+    "GET": LogShipper(Webhooks.GET_REQUEST),
+    "POST": LogShipper(Webhooks.POST_REQUEST),
+    "DELETE": LogShipper(Webhooks.DELETE_REQUEST),
+}
+
+
+async def stop_log_shippers():
+    await asyncio.gather(*(shipper.stop() for shipper in log_shippers.values()))